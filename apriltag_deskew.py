@@ -22,7 +22,9 @@ Usage:
 """
 
 import argparse
+import queue
 import sys
+import threading
 import time
 import tkinter as tk
 from datetime import datetime
@@ -38,14 +40,39 @@ from PIL import Image, ImageTk
 DISPLAY_W = 580
 DISPLAY_H = 380
 
+# Low-res YUV420 stream used for live detection and preview; the full-res
+# main stream is only pulled when a deskew or raw save is requested.
+LORES_W = 640
+LORES_H = 360
+
+# Detection reuse: skip the detector while every needed tag is cached and
+# each tag's bbox mean intensity stays within ROI_TOLERANCE grey levels, but
+# re-detect every REDETECT_EVERY frames regardless to recover from scene
+# changes.
+ROI_TOLERANCE = 3.0
+REDETECT_EVERY = 20
+
 
 # ---------------------------------------------------------------------------
 # Tag generation
 # ---------------------------------------------------------------------------
 
+_DICT_CACHE = {}
+
+
+def get_dictionary(family_name):
+    """Return the predefined ArUco dictionary for *family_name*, memoized."""
+    dictionary = _DICT_CACHE.get(family_name)
+    if dictionary is None:
+        dictionary = cv2.aruco.getPredefinedDictionary(
+            getattr(cv2.aruco, family_name))
+        _DICT_CACHE[family_name] = dictionary
+    return dictionary
+
+
 def generate_tags(tag_ids, size=300, border=80, family_name="DICT_APRILTAG_36h11"):
     """Create printable PNG images of the requested AprilTags."""
-    family = cv2.aruco.getPredefinedDictionary(getattr(cv2.aruco, family_name))
+    family = get_dictionary(family_name)
     for tid in tag_ids:
         tag_img = cv2.aruco.generateImageMarker(family, tid, size)
         bordered = cv2.copyMakeBorder(
@@ -65,20 +92,57 @@ def generate_tags(tag_ids, size=300, border=80, family_name="DICT_APRILTAG_36h11
 # Detection wrapper
 # ---------------------------------------------------------------------------
 
+def create_detector(family_name, preview=False):
+    """Build an ArUco detector for the given tag family.
+
+    Preview detectors skip corner refinement and search fewer adaptive
+    threshold windows -- enough to draw the overlay at 20 Hz.  The default
+    (capture) detector keeps sub-pixel corners for the actual warp.
+    """
+    dictionary = get_dictionary(family_name)
+    params = cv2.aruco.DetectorParameters()
+    if preview:
+        params.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_NONE
+        params.adaptiveThreshWinSizeMax = 23
+        params.adaptiveThreshWinSizeStep = 10
+        params.useAruco3Detection = True
+        params.minMarkerPerimeterRate = 0.05
+    else:
+        params.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_SUBPIX
+    return cv2.aruco.ArucoDetector(dictionary, params)
+
+
 def detect_tags(gray, detector):
     """Run the ArUco/AprilTag detector, return a list of dicts."""
     corners_list, ids, _ = detector.detectMarkers(gray)
     if ids is None:
         return []
-    results = []
-    for i, tag_id in enumerate(ids.flatten()):
-        c = corners_list[i][0]
-        results.append({
-            "id": int(tag_id),
-            "center": c.mean(axis=0),
-            "corners": c,
-        })
-    return results
+    corners = np.concatenate(corners_list, axis=0)  # (N, 4, 2)
+    centers = corners.mean(axis=1)
+    return [{"id": int(tag_id), "center": center, "corners": c}
+            for tag_id, center, c in zip(ids.ravel(), centers, corners)]
+
+
+def roi_signature(gray, detections):
+    """Mean intensity inside each detection's bounding box, as an array."""
+    h, w = gray.shape[:2]
+    sig = np.empty(len(detections), dtype=np.float64)
+    for i, det in enumerate(detections):
+        x0, y0 = np.floor(det["corners"].min(axis=0)).astype(int)
+        x1, y1 = np.ceil(det["corners"].max(axis=0)).astype(int)
+        roi = gray[max(y0, 0):min(y1 + 1, h), max(x0, 0):min(x1 + 1, w)]
+        sig[i] = roi.mean() if roi.size else 0.0
+    return sig
+
+
+def scale_detections(detections, sx, sy):
+    """Return a copy of *detections* with coordinates scaled by (sx, sy)."""
+    scale = np.array([sx, sy], dtype=np.float32)
+    return [{
+        "id": d["id"],
+        "center": d["center"] * scale,
+        "corners": d["corners"] * scale,
+    } for d in detections]
 
 
 # ---------------------------------------------------------------------------
@@ -87,22 +151,57 @@ def detect_tags(gray, detector):
 
 def order_points(pts):
     """Sort 4 points into top-left, top-right, bottom-right, bottom-left."""
-    pts = np.array(pts, dtype=np.float32)
+    pts = np.asarray(pts, dtype=np.float32)
     s = pts.sum(axis=1)
-    d = np.diff(pts, axis=1).flatten()
-    return np.array([
-        pts[np.argmin(s)],
-        pts[np.argmin(d)],
-        pts[np.argmax(s)],
-        pts[np.argmax(d)],
-    ], dtype=np.float32)
+    d = pts[:, 1] - pts[:, 0]
+    idx = np.array([s.argmin(), d.argmin(), s.argmax(), d.argmax()])
+    return pts[idx]
+
+
+def build_warp_maps(M, size):
+    """Build fixed-point remap tables equivalent to warpPerspective(M, size).
+
+    With identity camera matrices, initUndistortRectifyMap samples the
+    source at M^-1 * (u, v, 1) for every output pixel, which is exactly
+    what warpPerspective does internally on each call.
+    """
+    eye = np.eye(3)
+    return cv2.initUndistortRectifyMap(eye, None, M, eye, size, cv2.CV_16SC2)
+
+
+def warp_perspective_cached(image, src, dst, size, cache=None):
+    """Warp *image* mapping src -> dst points, reusing maps when possible.
+
+    *cache* is a dict owned by the caller.  Maps are keyed on the point
+    correspondences rounded to whole pixels, so a roughly stable tag pose
+    skips the map rebuild and only pays for cv2.remap.  Without a cache
+    (single-shot use) building maps would be wasted work, so the frame is
+    warped directly with the dst->src homography.
+    """
+    image = np.ascontiguousarray(image)
+    if cache is None:
+        M_inv = cv2.getPerspectiveTransform(dst, src)
+        return cv2.warpPerspective(image, M_inv, size,
+                                   flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP)
+
+    key = (size, np.round(src).astype(np.int32).tobytes(),
+           np.round(dst).astype(np.int32).tobytes())
+    if cache.get("key") == key:
+        map1, map2 = cache["maps"]
+    else:
+        M = cv2.getPerspectiveTransform(src, dst)
+        map1, map2 = build_warp_maps(M, size)
+        cache["key"] = key
+        cache["maps"] = (map1, map2)
+    return cv2.remap(image, map1, map2, cv2.INTER_LINEAR)
 
 
 # ---------------------------------------------------------------------------
 # Deskew algorithms
 # ---------------------------------------------------------------------------
 
-def deskew_four_tags(image, detections, tag_ids, output_size=None):
+def deskew_four_tags(image, detections, tag_ids, output_size=None,
+                     map_cache=None):
     """Perspective-correct the region bounded by 4 tags."""
     tag_map = {d["id"]: d for d in detections}
     missing = [t for t in tag_ids if t not in tag_map]
@@ -114,24 +213,27 @@ def deskew_four_tags(image, detections, tag_ids, output_size=None):
     if output_size:
         w, h = output_size
     else:
-        w = int(max(np.linalg.norm(src[1] - src[0]),
-                     np.linalg.norm(src[2] - src[3])))
-        h = int(max(np.linalg.norm(src[3] - src[0]),
-                     np.linalg.norm(src[2] - src[1])))
+        # Edge lengths TR-TL, BR-BL, BL-TL, BR-TR in one norm call
+        edges = np.linalg.norm(src[[1, 2, 3, 2]] - src[[0, 3, 0, 1]], axis=1)
+        w = int(max(edges[0], edges[1]))
+        h = int(max(edges[2], edges[3]))
     if w < 10 or h < 10:
         return None, "Detected region too small"
 
     dst = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]],
                    dtype=np.float32)
-    M = cv2.getPerspectiveTransform(src, dst)
-    return cv2.warpPerspective(image, M, (w, h)), None
+    return warp_perspective_cached(image, src, dst, (w, h), map_cache), None
+
 
+def deskew_single_tag(image, detection, output_size=None, map_cache=None):
+    """Correct perspective of the full image using one tag's square geometry.
 
-def deskew_single_tag(image, detection):
-    """Correct perspective of the full image using one tag's square geometry."""
+    If *output_size* is given, the scale to that size is folded into the
+    homography so the warp writes the final image directly.
+    """
     ordered = order_points(detection["corners"])
-    side = np.mean([np.linalg.norm(ordered[(i + 1) % 4] - ordered[i])
-                    for i in range(4)])
+    diffs = np.roll(ordered, -1, axis=0) - ordered
+    side = np.sqrt((diffs * diffs).sum(axis=1)).mean()
     cx, cy = ordered.mean(axis=0)
     half = side / 2.0
     dst = np.array([
@@ -140,39 +242,64 @@ def deskew_single_tag(image, detection):
         [cx + half, cy + half],
         [cx - half, cy + half],
     ], dtype=np.float32)
-    M = cv2.getPerspectiveTransform(ordered, dst)
     h, w = image.shape[:2]
-    return cv2.warpPerspective(image, M, (w, h)), None
+    if output_size:
+        dst *= np.array([output_size[0] / w, output_size[1] / h],
+                        dtype=np.float32)
+        w, h = output_size
+    return warp_perspective_cached(image, ordered, dst, (w, h), map_cache), None
 
 
 # ---------------------------------------------------------------------------
 # Drawing helpers
 # ---------------------------------------------------------------------------
 
-def draw_overlay(image, detections):
-    """Draw detected tag outlines and IDs onto the image."""
-    vis = image.copy()
+def draw_overlay(image, detections, scale=1.0):
+    """Draw detected tag outlines and IDs onto the image, in place.
+
+    Detection coordinates are multiplied by *scale*, so the overlay can be
+    drawn on an already-downscaled display buffer.
+    """
     for det in detections:
-        pts = det["corners"].astype(np.int32)
-        cv2.polylines(vis, [pts], True, (0, 255, 0), 3)
-        cx, cy = int(det["center"][0]), int(det["center"][1])
-        cv2.circle(vis, (cx, cy), 5, (0, 0, 255), -1)
-        cv2.putText(vis, str(det["id"]), (cx - 12, cy - 20),
+        pts = (det["corners"] * scale).astype(np.int32)
+        cv2.polylines(image, [pts], True, (0, 255, 0), 3)
+        cx, cy = int(det["center"][0] * scale), int(det["center"][1] * scale)
+        cv2.circle(image, (cx, cy), 5, (0, 0, 255), -1)
+        cv2.putText(image, str(det["id"]), (cx - 12, cy - 20),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-    return vis
+    return image
 
 
-def rgb_to_photoimage(rgb_array, max_w, max_h):
-    """Convert an RGB numpy array to a tkinter PhotoImage, fit within bounds."""
+def resize_for_display(rgb_array, max_w, max_h, dst=None):
+    """Downscale an RGB array to fit within bounds, return (resized, scale).
+
+    If *dst* already has the target shape it is reused as the output
+    buffer.  Arrays that already fit are returned as-is with scale 1.0.
+    """
     h, w = rgb_array.shape[:2]
     scale = min(max_w / w, max_h / h, 1.0)
+    if scale >= 1.0:
+        return rgb_array, 1.0
     new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
-    if scale < 1.0:
-        resized = cv2.resize(rgb_array, (new_w, new_h), interpolation=cv2.INTER_AREA)
-    else:
-        resized = rgb_array
-    pil_img = Image.fromarray(resized)
-    return ImageTk.PhotoImage(pil_img), new_w, new_h
+    if dst is None or dst.shape != (new_h, new_w, 3):
+        dst = np.empty((new_h, new_w, 3), dtype=np.uint8)
+    cv2.resize(rgb_array, (new_w, new_h), dst=dst,
+               interpolation=cv2.INTER_AREA)
+    return dst, scale
+
+
+def update_photoimage(photo, rgb_array):
+    """Blit an RGB array into *photo*, returning the (possibly new) PhotoImage.
+
+    The existing PhotoImage is pasted into when the size matches, so the
+    Tk image is only reallocated when the display dimensions change.
+    """
+    h, w = rgb_array.shape[:2]
+    pil_img = Image.fromarray(rgb_array)
+    if photo is None or photo.width() != w or photo.height() != h:
+        return ImageTk.PhotoImage(pil_img)
+    photo.paste(pil_img)
+    return photo
 
 
 # ---------------------------------------------------------------------------
@@ -197,33 +324,61 @@ class DeskewApp:
             self.output_size = (int(parts[0]), int(parts[1]))
 
         self.running = True
-        self.last_frame = None
-        self.last_detections = []
+        self.last_frame = None        # last full-res frame (on demand)
+        self.last_preview = None      # latest lores RGB preview frame
+        self.last_detections = []     # in lores coordinates
         self.deskewed_rgb = None
         self.save_count = 0
+        self._map_cache = {}  # remap tables reused while the tag pose is stable
+
+        # Single-slot hand-off from the capture thread to the Tk loop
+        self._frame_q = queue.Queue(maxsize=1)
+        # Reused downscale target for the live preview
+        self._display_buf = np.empty((DISPLAY_H, DISPLAY_W, 3), dtype=np.uint8)
 
         self._setup_detector()
         self._setup_camera()
         self._build_gui()
+        self._capture_thread = threading.Thread(target=self._capture_loop,
+                                                daemon=True)
+        self._capture_thread.start()
         self._update_feed()
 
     # -- Initialisation --
 
     def _setup_detector(self):
-        dictionary = cv2.aruco.getPredefinedDictionary(
-            getattr(cv2.aruco, self.args.family))
-        params = cv2.aruco.DetectorParameters()
-        self.detector = cv2.aruco.ArucoDetector(dictionary, params)
+        self.preview_detector = create_detector(self.args.family, preview=True)
+        self.capture_detector = create_detector(self.args.family)
 
     def _setup_camera(self):
         self.picam2 = Picamera2()
-        config = self.picam2.create_preview_configuration(
+        config = self.picam2.create_video_configuration(
             main={"size": (self.args.width, self.args.height),
-                   "format": "RGB888"})
+                   "format": "RGB888"},
+            lores={"size": (LORES_W, LORES_H), "format": "YUV420"},
+            buffer_count=2)
         self.picam2.configure(config)
         self.picam2.start()
         time.sleep(0.5)
 
+    def _capture_main(self):
+        """Grab a full-res frame and return it with detections for deskew.
+
+        The full-res frame is re-detected with sub-pixel refinement; if that
+        misses any needed tag, the latest preview detections are rescaled
+        to main-res coordinates instead.
+        """
+        frame = self.picam2.capture_array("main")
+        self.last_frame = frame
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        detections = detect_tags(gray, self.capture_detector)
+        found = {d["id"] for d in detections}
+        if all(t in found for t in self.needed_ids):
+            return frame, detections
+        h, w = frame.shape[:2]
+        return frame, scale_detections(self.last_detections,
+                                       w / LORES_W, h / LORES_H)
+
     # -- GUI layout --
 
     def _build_gui(self):
@@ -254,6 +409,8 @@ class DeskewApp:
                                      bg="#181825", highlightthickness=0)
         self.feed_canvas.pack(fill="both", expand=True)
         self._feed_photo = None
+        self._feed_item = self.feed_canvas.create_image(
+            DISPLAY_W // 2, DISPLAY_H // 2)
 
         # Right panel: deskewed result
         right = ttk.Frame(panels)
@@ -264,6 +421,8 @@ class DeskewApp:
                                        bg="#181825", highlightthickness=0)
         self.result_canvas.pack(fill="both", expand=True)
         self._result_photo = None
+        self._result_item = self.result_canvas.create_image(
+            DISPLAY_W // 2, DISPLAY_H // 2)
 
         # -- Middle: status bar --
         status_frame = ttk.Frame(self.root)
@@ -321,22 +480,61 @@ class DeskewApp:
             self.single_tag_id = None
             self.needed_ids = self.tag_ids
 
+    # -- Capture thread (owns the lores capture + detection) --
+
+    def _capture_loop(self):
+        detections = []
+        signature = None
+        frames_since_detect = 0
+        while self.running:
+            # Detect on the Y plane of the lores stream -- no RGB->gray needed
+            yuv = self.picam2.capture_array("lores")
+            gray = yuv[:LORES_H, :LORES_W]
+
+            # Reuse the previous detections while the tag regions look
+            # unchanged; a static layout then costs a few ROI means per frame.
+            # Until every needed tag is found, detect on every frame so a
+            # tag entering the view is picked up immediately
+            found = {d["id"] for d in detections}
+            stable = False
+            if (detections and frames_since_detect < REDETECT_EVERY
+                    and found.issuperset(self.needed_ids)):
+                new_sig = roi_signature(gray, detections)
+                stable = np.all(np.abs(new_sig - signature) <= ROI_TOLERANCE)
+            if stable:
+                frames_since_detect += 1
+            else:
+                detections = detect_tags(gray, self.preview_detector)
+                signature = roi_signature(gray, detections)
+                frames_since_detect = 0
+
+            frame = cv2.cvtColor(yuv, cv2.COLOR_YUV2RGB_I420)
+
+            # Keep only the newest result: replace anything not yet consumed
+            try:
+                self._frame_q.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._frame_q.put_nowait((frame, detections))
+            except queue.Full:
+                pass
+
     # -- Camera feed loop --
 
     def _update_feed(self):
         if not self.running:
             return
 
-        frame = self.picam2.capture_array()
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-        detections = detect_tags(gray, self.detector)
+        try:
+            frame, detections = self._frame_q.get_nowait()
+        except queue.Empty:
+            self.root.after(10, self._update_feed)
+            return
 
-        self.last_frame = frame
+        self.last_preview = frame
         self.last_detections = detections
 
-        # Draw overlay
-        vis = draw_overlay(frame, detections)
-
         # Update status
         found_ids = sorted([d["id"] for d in detections])
         ready = all(t in found_ids for t in self.needed_ids)
@@ -350,46 +548,50 @@ class DeskewApp:
                 f"Tags detected: {found_ids}  --  Missing: {missing}")
             self.status_label.configure(style="Warn.TLabel")
 
-        # Render to left canvas
+        # Render to left canvas: downscale first, then draw the overlay on
+        # the small buffer instead of copying the full frame
         cw = self.feed_canvas.winfo_width()
         ch = self.feed_canvas.winfo_height()
         if cw < 2 or ch < 2:
             cw, ch = DISPLAY_W, DISPLAY_H
-        photo, pw, ph = rgb_to_photoimage(vis, cw, ch)
-        self._feed_photo = photo  # prevent GC
-        self.feed_canvas.delete("all")
-        self.feed_canvas.create_image(cw // 2, ch // 2, image=photo)
+        vis, scale = resize_for_display(frame, cw, ch, self._display_buf)
+        if scale < 1.0:
+            self._display_buf = vis
+        draw_overlay(vis, detections, scale)
+        self._feed_photo = update_photoimage(self._feed_photo, vis)
+        self.feed_canvas.coords(self._feed_item, cw // 2, ch // 2)
+        self.feed_canvas.itemconfigure(self._feed_item, image=self._feed_photo)
 
         self.root.after(50, self._update_feed)  # ~20 fps
 
     # -- Actions --
 
     def do_deskew(self):
-        if self.last_frame is None:
+        if self.last_preview is None:
             return
 
+        frame, detections = self._capture_main()
+
         if self.single_tag_id is not None:
-            det = next((d for d in self.last_detections
+            det = next((d for d in detections
                         if d["id"] == self.single_tag_id), None)
             if det is None:
                 self.status_var.set(
                     f"Cannot deskew: tag {self.single_tag_id} not found")
                 self.status_label.configure(style="Warn.TLabel")
                 return
-            result, err = deskew_single_tag(self.last_frame, det)
+            result, err = deskew_single_tag(frame, det, self.output_size,
+                                            self._map_cache)
         else:
             result, err = deskew_four_tags(
-                self.last_frame, self.last_detections,
-                self.tag_ids, self.output_size)
+                frame, detections, self.tag_ids, self.output_size,
+                self._map_cache)
 
         if err:
             self.status_var.set(f"Deskew failed: {err}")
             self.status_label.configure(style="Warn.TLabel")
             return
 
-        if self.output_size:
-            result = cv2.resize(result, self.output_size)
-
         self.deskewed_rgb = result
         self._show_result(result)
         self.status_var.set("Deskewed! Press 's' or click Save.")
@@ -400,10 +602,11 @@ class DeskewApp:
         ch = self.result_canvas.winfo_height()
         if cw < 2 or ch < 2:
             cw, ch = DISPLAY_W, DISPLAY_H
-        photo, pw, ph = rgb_to_photoimage(rgb_array, cw, ch)
-        self._result_photo = photo
-        self.result_canvas.delete("all")
-        self.result_canvas.create_image(cw // 2, ch // 2, image=photo)
+        small, _ = resize_for_display(rgb_array, cw, ch)
+        self._result_photo = update_photoimage(self._result_photo, small)
+        self.result_canvas.coords(self._result_item, cw // 2, ch // 2)
+        self.result_canvas.itemconfigure(self._result_item,
+                                         image=self._result_photo)
 
     def save_deskewed(self):
         if self.deskewed_rgb is None:
@@ -413,21 +616,36 @@ class DeskewApp:
         self.save_count += 1
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         fname = f"deskewed_{ts}.jpg"
-        cv2.imwrite(fname, cv2.cvtColor(self.deskewed_rgb, cv2.COLOR_RGB2BGR))
+        self._save_in_background(self.deskewed_rgb, fname)
         self.status_var.set(f"Saved: {fname}")
         self.status_label.configure(style="Status.TLabel")
 
     def save_raw(self):
-        if self.last_frame is None:
+        if self.last_preview is None:
             return
+        frame = self.picam2.capture_array("main")
+        self.last_frame = frame
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         fname = f"raw_{ts}.jpg"
-        cv2.imwrite(fname, cv2.cvtColor(self.last_frame, cv2.COLOR_RGB2BGR))
+        self._save_in_background(frame, fname)
         self.status_var.set(f"Saved raw: {fname}")
         self.status_label.configure(style="Status.TLabel")
 
+    def _save_in_background(self, rgb_array, fname):
+        """Convert + JPEG-encode + write on a worker so the UI never stalls.
+
+        The arrays passed in are never modified after capture/deskew (new
+        results replace them), so no defensive copy is needed.
+        """
+        def job():
+            if not cv2.imwrite(fname, cv2.cvtColor(rgb_array,
+                                                   cv2.COLOR_RGB2BGR)):
+                print(f"Failed to save {fname}")
+        threading.Thread(target=job, daemon=True).start()
+
     def quit(self):
         self.running = False
+        self._capture_thread.join(timeout=1.0)
         self.picam2.stop()
         self.root.destroy()
 
@@ -443,20 +661,21 @@ def headless_capture(args):
         parts = args.output_size.split("x")
         output_size = (int(parts[0]), int(parts[1]))
 
-    dictionary = cv2.aruco.getPredefinedDictionary(
-        getattr(cv2.aruco, args.family))
-    detector = cv2.aruco.ArucoDetector(dictionary, cv2.aruco.DetectorParameters())
+    detector = create_detector(args.family)
 
     picam2 = Picamera2()
     config = picam2.create_preview_configuration(
-        main={"size": (args.width, args.height), "format": "RGB888"})
+        main={"size": (args.width, args.height), "format": "YUV420"})
     picam2.configure(config)
     picam2.start()
     time.sleep(1)
 
-    frame = picam2.capture_array()
-    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    # The Y plane is the grayscale image; convert straight to BGR for the
+    # warp and imwrite instead of going through RGB
+    yuv = picam2.capture_array()
+    gray = yuv[:args.height, :args.width]
     detections = detect_tags(gray, detector)
+    frame = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420)
     print(f"Detected tags: {[d['id'] for d in detections]}")
 
     if args.single_tag is not None:
@@ -465,21 +684,19 @@ def headless_capture(args):
             print(f"Tag {args.single_tag} not found")
             picam2.stop()
             sys.exit(1)
-        result, err = deskew_single_tag(frame, det)
+        result, err = deskew_single_tag(frame, det, output_size)
     else:
         result, err = deskew_four_tags(frame, detections, tag_ids, output_size)
 
     if err:
         print(f"Deskew failed: {err}")
         raw_path = str(Path(args.output).with_suffix("")) + "_raw.jpg"
-        cv2.imwrite(raw_path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        cv2.imwrite(raw_path, frame)
         print(f"Saved raw frame: {raw_path}")
         picam2.stop()
         sys.exit(1)
 
-    if output_size:
-        result = cv2.resize(result, output_size)
-    cv2.imwrite(args.output, cv2.cvtColor(result, cv2.COLOR_RGB2BGR))
+    cv2.imwrite(args.output, result)
     print(f"Saved deskewed image: {args.output}")
     picam2.stop()
 
@@ -1,14 +1,20 @@
 import socket
 import pyaudio
 import os
+import struct
 from dotenv import load_dotenv
 from io import BytesIO
-import wave
 from elevenlabs.client import ElevenLabs
 import torch
 import numpy as np
-from scipy.signal import resample_poly
-from silero_vad import load_silero_vad, VADIterator
+from scipy.signal import firwin, resample_poly
+from silero_vad import load_silero_vad
+
+# numba is optional — without it we fall back to scipy's resample_poly
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 load_dotenv()
 
@@ -32,21 +38,134 @@ FORMAT = pyaudio.paInt16
 VAD_CHUNK_SAMPLES = 512  # Silero requires exactly 512 samples at 16kHz
 MIN_SILENCE_DURATION_MS = 700
 SPEECH_PAD_MS = 300
+VAD_THRESHOLD = 0.3
+
+
+class VadStateMachine:
+    """Silero VADIterator's start/end logic, driven by a precomputed prob.
+
+    VADIterator runs the model itself, so using it alongside our own
+    speech_prob call ran the (stateful) model twice per chunk.  Here the
+    model is invoked once and its probability is replayed through the same
+    hysteresis / min-silence / speech-pad rules.
+    """
+
+    def __init__(self, threshold, sampling_rate, min_silence_duration_ms,
+                 speech_pad_ms):
+        self.threshold = threshold
+        self.min_silence_samples = sampling_rate * min_silence_duration_ms / 1000
+        self.speech_pad_samples = sampling_rate * speech_pad_ms / 1000
+        self.reset()
+
+    def reset(self):
+        self.triggered = False
+        self.temp_end = 0
+        self.current_sample = 0
+
+    def __call__(self, speech_prob, window_size_samples):
+        """Advance by one window; return {'start': n}, {'end': n} or None."""
+        self.current_sample += window_size_samples
 
-vad_iterator = VADIterator(
-    model,
-    threshold=0.3,
+        if speech_prob >= self.threshold and self.temp_end:
+            self.temp_end = 0
+
+        if speech_prob >= self.threshold and not self.triggered:
+            self.triggered = True
+            start = max(0, self.current_sample - self.speech_pad_samples
+                        - window_size_samples)
+            return {'start': int(start)}
+
+        if speech_prob < self.threshold - 0.15 and self.triggered:
+            if not self.temp_end:
+                self.temp_end = self.current_sample
+            if self.current_sample - self.temp_end < self.min_silence_samples:
+                return None
+            end = self.temp_end + self.speech_pad_samples - window_size_samples
+            self.temp_end = 0
+            self.triggered = False
+            return {'end': int(end)}
+
+        return None
+
+
+vad_iterator = VadStateMachine(
+    threshold=VAD_THRESHOLD,
     sampling_rate=RATE_VAD,
     min_silence_duration_ms=MIN_SILENCE_DURATION_MS,
     speech_pad_ms=SPEECH_PAD_MS
 )
 
 # --- Resampling helper (scipy replaces torchaudio) ---
+RESAMPLE_UP = 160
+RESAMPLE_DOWN = 441
+
+# Same anti-aliasing filter resample_poly designs internally, built once
+_max_rate = max(RESAMPLE_UP, RESAMPLE_DOWN)
+RESAMPLE_FIR = firwin(2 * 10 * _max_rate + 1, 1.0 / _max_rate,
+                      window=('kaiser', 5.0)) * RESAMPLE_UP
+# Q15 fixed-point taps (|h| < 0.4) so the JIT kernel stays in integer math
+RESAMPLE_FIR_Q15 = np.round(RESAMPLE_FIR * 32768.0).astype(np.int16)
+
+
+def _polyphase_resample_i16(x, h_q15, up, down, n_out):
+    """int16 -> normalized float32 polyphase resample producing n_out samples.
+
+    Equivalent to resample_poly(x / 32768, up, down) trimmed/zero-padded to
+    n_out, but only evaluates the taps that hit non-zero upsampled samples.
+    Samples and Q15 taps are multiplied as integers into an int64
+    accumulator (int32 would overflow over ~55 taps); only the n_out
+    results are converted to float.
+    """
+    out = np.zeros(n_out, dtype=np.float32)
+    delay = (h_q15.size - 1) // 2
+    for n in range(n_out):
+        j = n * down + delay
+        k = j % up
+        i = (j - k) // up
+        acc = np.int64(0)
+        while k < h_q15.size and i >= 0:
+            if i < x.size:
+                acc += np.int64(h_q15[k]) * np.int64(x[i])
+            k += up
+            i -= 1
+        out[n] = acc * (1.0 / (32768.0 * 32768.0))
+    return out
+
+
+if njit is not None:
+    _polyphase_resample_i16 = njit(cache=True, fastmath=True)(
+        _polyphase_resample_i16)
+
+
 def resample_audio(audio_int16):
-    """Resample int16 numpy array from 44100 Hz to 16000 Hz using scipy."""
-    audio_float = audio_int16.astype(np.float32) / 32768.0
-    resampled = resample_poly(audio_float, up=160, down=441)
-    return torch.from_numpy(resampled.astype(np.float32))
+    """Resample int16 numpy array from 44100 Hz to exactly one VAD chunk."""
+    if njit is not None:
+        resampled = _polyphase_resample_i16(
+            audio_int16, RESAMPLE_FIR_Q15, RESAMPLE_UP, RESAMPLE_DOWN,
+            VAD_CHUNK_SAMPLES)
+    else:
+        audio_float = audio_int16.astype(np.float32) / 32768.0
+        resampled = resample_poly(audio_float, up=RESAMPLE_UP,
+                                  down=RESAMPLE_DOWN).astype(np.float32)
+        # Ensure exactly 512 samples by padding or trimming
+        if len(resampled) < VAD_CHUNK_SAMPLES:
+            resampled = np.pad(resampled, (0, VAD_CHUNK_SAMPLES - len(resampled)))
+        else:
+            resampled = resampled[:VAD_CHUNK_SAMPLES]
+    return torch.from_numpy(resampled)
+
+# --- WAV helper (fixed format, so the RIFF header is built directly) ---
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def make_wav_header(data_len):
+    """44-byte PCM WAV header for mono 16-bit audio at RATE_RECEIVE."""
+    block_align = CHANNELS * 2
+    return WAV_HEADER.pack(
+        b"RIFF", 36 + data_len, b"WAVE",
+        b"fmt ", 16, 1, CHANNELS, RATE_RECEIVE,
+        RATE_RECEIVE * block_align, block_align, 16,
+        b"data", data_len)
 
 # --- Create ElevenLabs client ---
 elevenlabs = ElevenLabs(
@@ -57,7 +176,7 @@ elevenlabs = ElevenLabs(
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 sock.bind((UDP_IP, UDP_PORT))
 print(f"Listening for audio on UDP port {UDP_PORT}...")
-print(f"VAD Threshold: 0.3 (lower = more sensitive)")
+print(f"VAD Threshold: {VAD_THRESHOLD} (lower = more sensitive)")
 
 # Calculate buffer requirements - need exact samples
 samples_needed_44k = int(VAD_CHUNK_SAMPLES * RATE_RECEIVE / RATE_VAD)
@@ -74,32 +193,30 @@ stream = p.open(format=FORMAT,
                 frames_per_buffer=BUFFER_SIZE)
 
 # --- State variables ---
-packet_buffer_vad = b''
+# Packets are received straight into this buffer; it never holds more than
+# one partial VAD chunk plus one packet, so it is sized for exactly that.
+vad_buffer = bytearray(bytes_needed + BUFFER_SIZE)
+vad_view = memoryview(vad_buffer)
+vad_fill = 0
 is_recording = False
-recorded_chunks_original = []
+recorded_audio = bytearray()  # original-rate audio, extended in place
 chunk_count = 0
 packet_count = 0
 
 def transcribe_audio():
-    global recorded_chunks_original
-    
-    if len(recorded_chunks_original) == 0:
+    if len(recorded_audio) == 0:
         print("⚠️ No audio to transcribe")
         return
     
-    print(f"📊 Transcribing {len(recorded_chunks_original)} chunks...")
+    print(f"📊 Transcribing {len(recorded_audio) / (RATE_RECEIVE * 2):.1f}s of audio...")
     
-    # Concatenate all recorded audio at original rate
-    audio_data = b''.join(recorded_chunks_original)
+    # Original-rate audio is already contiguous
+    audio_data = recorded_audio
     
     # Create WAV file in memory at original rate for better quality
     wav_buffer = BytesIO()
-    with wave.open(wav_buffer, 'wb') as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(2)
-        wf.setframerate(RATE_RECEIVE)
-        wf.writeframes(audio_data)
-    
+    wav_buffer.write(make_wav_header(len(audio_data)))
+    wav_buffer.write(audio_data)
     wav_buffer.seek(0)
     
     # Transcribe with ElevenLabs
@@ -118,64 +235,57 @@ def transcribe_audio():
     except Exception as e:
         print(f"❌ Transcription error: {e}")
     
-    recorded_chunks_original = []
+    recorded_audio.clear()
 
 try:
     while True:
-        data, addr = sock.recvfrom(BUFFER_SIZE)
+        # Receive directly into the VAD buffer after any leftover bytes
+        nbytes = sock.recv_into(vad_view[vad_fill:], BUFFER_SIZE)
         packet_count += 1
         
         # Play received audio at original rate
-        stream.write(data)
+        stream.write(bytes(vad_view[vad_fill:vad_fill + nbytes]))
+        vad_fill += nbytes
         
-        # Add to VAD buffer
-        packet_buffer_vad += data
-        
-        while len(packet_buffer_vad) >= bytes_needed:
-            chunk_original = packet_buffer_vad[:bytes_needed]
-            packet_buffer_vad = packet_buffer_vad[bytes_needed:]
+        while vad_fill >= bytes_needed:
+            chunk_original = vad_view[:bytes_needed]
             
-            # Convert to numpy array and resample with scipy
-            audio_44k = np.frombuffer(chunk_original, dtype=np.int16).copy()
+            # Convert to numpy array and resample to exactly 512 samples
+            audio_44k = np.frombuffer(chunk_original, dtype=np.int16)
             audio_16k_float = resample_audio(audio_44k)
             
-            # Ensure exactly 512 samples by padding or trimming
-            if len(audio_16k_float) < VAD_CHUNK_SAMPLES:
-                # Pad with zeros
-                padding = VAD_CHUNK_SAMPLES - len(audio_16k_float)
-                audio_16k_float = torch.nn.functional.pad(audio_16k_float, (0, padding))
-            elif len(audio_16k_float) > VAD_CHUNK_SAMPLES:
-                # Trim
-                audio_16k_float = audio_16k_float[:VAD_CHUNK_SAMPLES]
-            
             chunk_count += 1
             
-            # Get raw speech probability for debugging
-            with torch.no_grad():
+            # Single model call per chunk — the state machine reuses the prob
+            with torch.inference_mode():
                 speech_prob = model(audio_16k_float, RATE_VAD).item()
             
             # Print probability every 30 chunks
             # if chunk_count % 30 == 0:
-            #     print(f"🎵 Chunk {chunk_count}: Speech probability = {speech_prob:.3f} (threshold: 0.3)")
+            #     print(f"🎵 Chunk {chunk_count}: Speech probability = {speech_prob:.3f} (threshold: {VAD_THRESHOLD})")
             
             # Process with VAD
-            speech_dict = vad_iterator(audio_16k_float, return_seconds=False)
+            speech_dict = vad_iterator(speech_prob, VAD_CHUNK_SAMPLES)
             
             # Always add original quality audio to buffer if recording
             if is_recording:
-                recorded_chunks_original.append(chunk_original)
+                recorded_audio.extend(chunk_original)
             
             # Handle VAD events
             if speech_dict:
                 if 'start' in speech_dict and not is_recording:
                     print(f"\n🎤 Speech detected! (prob: {speech_prob:.3f})")
                     is_recording = True
-                    recorded_chunks_original = [chunk_original]
+                    recorded_audio[:] = chunk_original
                 
                 if 'end' in speech_dict and is_recording:
                     print(f"🔇 Speech ended (prob: {speech_prob:.3f})")
                     is_recording = False
                     transcribe_audio()
+            
+            # Shift the (sub-packet) remainder to the front of the buffer
+            vad_fill -= bytes_needed
+            vad_buffer[:vad_fill] = vad_view[bytes_needed:bytes_needed + vad_fill]
 
 except KeyboardInterrupt:
     print("\nStopping...")
@@ -10,8 +10,13 @@ import subprocess
 load_dotenv()
 
 ESP32_IP = '172.20.10.12'
+ESP32_PORT = 12345
 MAX_PACKET_SIZE = 1024
 FRAMES_PER_PACKET = MAX_PACKET_SIZE // 4  # 4 bytes per frame (stereo 16-bit)
+# Pace at real time against absolute deadlines; the first PREBUFFER_PACKETS
+# go out immediately so the ESP32 starts a few packets ahead of the DAC
+PACKET_PERIOD = FRAMES_PER_PACKET / 44100.0
+PREBUFFER_PACKETS = 4
 
 elevenlabs = ElevenLabs(
     api_key=os.getenv("ELEVENLABS_API_KEY"),
@@ -41,37 +46,49 @@ process = subprocess.Popen([
 
 wav_data, _ = process.communicate(input=audio_bytes)
 
-# Open WAV data
+# Read all PCM frames once and pre-split into zero-copy packet views
 wf = wave.open(io.BytesIO(wav_data), 'rb')
+duration = wf.getnframes() / wf.getframerate()
+pcm = memoryview(wf.readframes(wf.getnframes()))
+wf.close()
+packets = [pcm[i:i + MAX_PACKET_SIZE]
+           for i in range(0, len(pcm), MAX_PACKET_SIZE)]
+
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+esp32_addr = (ESP32_IP, ESP32_PORT)
 
 print(f"Sending with max packet size: {MAX_PACKET_SIZE} bytes")
 print(f"Frames per packet: {FRAMES_PER_PACKET}")
-print(f"Audio duration: {wf.getnframes() / wf.getframerate():.2f}s\n")
+print(f"Audio duration: {duration:.2f}s\n")
 
 packet_count = 0
-start_time = time.time()
+start_time = time.monotonic()
+# Absolute deadlines, so sleep jitter never accumulates
+next_send = start_time - PREBUFFER_PACKETS * PACKET_PERIOD
 
 try:
-    while True:
-        data = wf.readframes(FRAMES_PER_PACKET)
-        
-        if not data:
-            elapsed = time.time() - start_time
-            print(f"\nPlayback complete in {elapsed:.1f}s ({packet_count} packets)")
-            break
-        
-        sock.sendto(data, (ESP32_IP, 12345))
-        packet_count += 1
-        
-        if packet_count % 50 == 0:
-            print(f"Sent {packet_count} packets")
+    while packet_count < len(packets):
+        # Send every packet whose deadline has passed, so a late wake-up
+        # catches up in one burst instead of drifting behind
+        now = time.monotonic()
+        while packet_count < len(packets) and next_send <= now:
+            sock.sendto(packets[packet_count], esp32_addr)
+            packet_count += 1
+            next_send += PACKET_PERIOD
+            
+            if packet_count % 50 == 0:
+                print(f"Sent {packet_count} packets")
         
         # Timing: FRAMES_PER_PACKET frames at 44100 Hz
-        time.sleep(FRAMES_PER_PACKET / 44100.0 * 0.8)
+        delay = next_send - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    elapsed = time.monotonic() - start_time
+    print(f"\nPlayback complete in {elapsed:.1f}s ({packet_count} packets)")
 
 except KeyboardInterrupt:
     print(f"\nStopped at {packet_count} packets")
 
-wf.close()
 sock.close()
\ No newline at end of file
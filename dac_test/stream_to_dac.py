@@ -7,27 +7,32 @@ WAV_FILE = 'doremi.wav'
 
 wf = wave.open(WAV_FILE, 'rb')
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
 
 MAX_PACKET_SIZE = 1024  # Safe size that works
 FRAMES_PER_PACKET = MAX_PACKET_SIZE // 4  # 4 bytes per frame (stereo 16-bit)
+PACKET_PERIOD = FRAMES_PER_PACKET / wf.getframerate()
 
 print(f"Sending with max packet size: {MAX_PACKET_SIZE} bytes")
 print(f"Frames per packet: {FRAMES_PER_PACKET}\n")
 
 packet_count = 0
-start_time = time.time()
+start_time = time.monotonic()
+next_send = start_time  # absolute deadline, so sleep jitter never accumulates
+behind = False  # in a catch-up burst; reported once per stall
 
 try:
     while True:
         data = wf.readframes(FRAMES_PER_PACKET)
         
         if not data:
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             print(f"\nFile complete in {elapsed:.1f}s ({packet_count} packets)")
             wf.rewind()
             time.sleep(1)
             packet_count = 0
-            start_time = time.time()
+            start_time = time.monotonic()
+            next_send = start_time
             continue
         
         sock.sendto(data, (ESP32_IP, 12345))
@@ -36,8 +41,15 @@ try:
         if packet_count % 50 == 0:
             print(f"Sent {packet_count} packets")
         
-        # Timing: FRAMES_PER_PACKET frames at 44100 Hz
-        time.sleep(FRAMES_PER_PACKET / 44100.0 * 0.8)  # 90% speed to stay ahead
+        # Timing: one packet per FRAMES_PER_PACKET frames of real time
+        next_send += PACKET_PERIOD
+        remaining = next_send - time.monotonic()
+        if remaining > 0:
+            behind = False
+            time.sleep(remaining)
+        elif remaining < -PACKET_PERIOD and not behind:
+            behind = True
+            print(f"Behind schedule by {-remaining * 1000:.1f} ms, catching up")
 
 except KeyboardInterrupt:
     print(f"\nStopped at {packet_count} packets")
@@ -5,6 +5,7 @@ ESP32_IP = '172.20.10.12'
 UDP_PORT = 12345
 
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
 
 print(f"Sending 100 packets to {ESP32_IP}:{UDP_PORT}")
 print("Check ESP32 serial monitor\n")
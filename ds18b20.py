@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """DS18B20 temperature sensor reader via 1-Wire kernel interface on BCM GPIO 17 (physical pin 11)."""
 
-import glob
 import os
 import subprocess
 import sys
@@ -10,10 +9,25 @@ import time
 W1_DEVICES_PATH = "/sys/bus/w1/devices/"
 DS18B20_PREFIX = "28-"
 GPIO_PIN = 17  # Physical pin 11 = BCM GPIO 17
+W1_MODULES = ("w1_gpio", "w1_therm")  # names as listed in /proc/modules
+
+
+def kernel_modules_ready():
+    """True if the 1-Wire modules are loaded and a DS18B20 is already visible."""
+    try:
+        with open("/proc/modules") as f:
+            loaded = {line.split(" ", 1)[0] for line in f}
+    except OSError:
+        return False
+    return all(m in loaded for m in W1_MODULES) and find_sensor() is not None
 
 
 def setup_kernel_modules():
-    """Load w1-gpio and w1-therm kernel modules and enable the dtoverlay."""
+    """Load w1-gpio and w1-therm kernel modules and enable the dtoverlay.
+    Skipped entirely on warm starts where the sensor is already up."""
+    if kernel_modules_ready():
+        return
+
     try:
         subprocess.run(
             ["sudo", "dtoverlay", "w1-gpio", f"gpiopin={GPIO_PIN}"],
@@ -32,10 +46,12 @@ def setup_kernel_modules():
 
 def find_sensor():
     """Find the first DS18B20 device directory."""
-    devices = glob.glob(os.path.join(W1_DEVICES_PATH, DS18B20_PREFIX + "*"))
-    if not devices:
-        return None
-    return devices[0]
+    try:
+        with os.scandir(W1_DEVICES_PATH) as entries:
+            return next((e.path for e in entries
+                         if e.name.startswith(DS18B20_PREFIX)), None)
+    except FileNotFoundError:
+        return None  # w1 bus not loaded yet
 
 
 def read_temperature(device_path):
@@ -44,19 +60,20 @@ def read_temperature(device_path):
     Returns the temperature as a float, or None on read failure.
     """
     slave_file = os.path.join(device_path, "w1_slave")
-    with open(slave_file, "r") as f:
-        lines = f.readlines()
+    with open(slave_file, "rb") as f:
+        buf = f.read()
 
     # First line ends with YES if the CRC check passed
-    if len(lines) < 2 or "YES" not in lines[0]:
+    eol = buf.find(b"\n")
+    if eol == -1 or b"YES" not in buf[:eol]:
         return None
 
     # Second line contains t=<millidegrees>
-    idx = lines[1].find("t=")
+    idx = buf.find(b"t=", eol)
     if idx == -1:
         return None
 
-    raw = int(lines[1][idx + 2:])
+    raw = int(buf[idx + 2:])
     return raw / 1000.0
 
 
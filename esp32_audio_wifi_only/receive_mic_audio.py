@@ -1,4 +1,5 @@
 import socket
+import numpy as np
 import pyaudio
 
 # --- UDP configuration ---
@@ -10,9 +11,61 @@ BUFFER_SIZE = 1024  # Must match ESP32 packet size
 CHANNELS = 1         # Mono
 RATE = 44100         # Sample rate
 FORMAT = pyaudio.paInt16  # 16-bit PCM
+FRAMES_PER_BUFFER = BUFFER_SIZE // (CHANNELS * 2)  # one UDP packet, in frames
+
+# --- Jitter buffer configuration ---
+RING_FRAMES = RATE                # 1 s of capacity
+PREBUFFER_FRAMES = RATE * 40 // 1000  # ~40 ms queued before playback starts
+
+# --- Ring buffer shared between the network loop and the audio callback ---
+# Single producer (main loop) / single consumer (PortAudio thread). Each side
+# only advances its own counter, so no lock is needed under the GIL.
+ring = np.zeros(RING_FRAMES, dtype=np.int16)
+write_pos = 0
+read_pos = 0
+primed = False
+silence = bytes(FRAMES_PER_BUFFER * 2)
+
+
+def ring_write(samples):
+    """Append samples to the ring; drops the packet if the ring is full."""
+    global write_pos
+    n = len(samples)
+    if write_pos - read_pos + n > RING_FRAMES:
+        return False
+    start = write_pos % RING_FRAMES
+    first = min(n, RING_FRAMES - start)
+    ring[start:start + first] = samples[:first]
+    ring[:n - first] = samples[first:]
+    write_pos += n
+    return True
+
+
+def audio_callback(in_data, frame_count, time_info, status):
+    """PortAudio callback: play from the ring, re-priming after an underrun."""
+    global read_pos, primed
+    available = write_pos - read_pos
+    if not primed:
+        if available < PREBUFFER_FRAMES:
+            return (silence[:frame_count * 2], pyaudio.paContinue)
+        primed = True
+    if available < frame_count:
+        primed = False
+        return (silence[:frame_count * 2], pyaudio.paContinue)
+
+    start = read_pos % RING_FRAMES
+    first = min(frame_count, RING_FRAMES - start)
+    if first == frame_count:
+        out = ring[start:start + frame_count].tobytes()
+    else:
+        out = ring[start:].tobytes() + ring[:frame_count - first].tobytes()
+    read_pos += frame_count
+    return (out, pyaudio.paContinue)
+
 
 # --- Setup UDP socket ---
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
 sock.bind((UDP_IP, UDP_PORT))
 print(f"Listening for audio on UDP port {UDP_PORT}...")
 
@@ -22,13 +75,20 @@ stream = p.open(format=FORMAT,
                 channels=CHANNELS,
                 rate=RATE,
                 output=True,
-                frames_per_buffer=BUFFER_SIZE)
+                frames_per_buffer=FRAMES_PER_BUFFER,
+                stream_callback=audio_callback)
 
 try:
+    # Lock onto the first sender's IP. Not its port: the ESP32 sends from an
+    # unbound WiFiUDP, so the source port changes after every reconnect
+    data, addr = sock.recvfrom(BUFFER_SIZE)
+    sender_ip = addr[0]
+    print(f"Receiving from {sender_ip}")
     while True:
+        if addr[0] == sender_ip:
+            # Queue received audio; the callback plays it
+            ring_write(np.frombuffer(data, dtype=np.int16))
         data, addr = sock.recvfrom(BUFFER_SIZE)
-        # Play received audio
-        stream.write(data)
 except KeyboardInterrupt:
     print("Stopping...")
 finally:
@@ -7,29 +7,65 @@ Periodically sends frames to a local Ollama VLM for scene analysis.
 Usage:
     python3 jetson_processor.py --port 9001 --return-port 9002
     python3 jetson_processor.py --yolo --model yolov8n.pt --conf 0.25
+    python3 jetson_processor.py --yolo --workers 2   # one worker per camera
 """
 
 import argparse
 import base64
+import ctypes
+import ctypes.util
+import http.client
 import json
 import logging
+import multiprocessing
 import os
+import select
 import socket
 import struct
 import threading
 import time
-import urllib.request
+import traceback
 from datetime import datetime
-from queue import Queue, Full
+from queue import Empty, Queue, Full
 
 import cv2
 import numpy as np
 
+try:
+    from turbojpeg import TJPF_BGR, TJSAMP_420, TurboJPEG
+    _turbo = TurboJPEG()  # raises if libturbojpeg itself is missing
+except (ImportError, OSError, RuntimeError):
+    _turbo = None
+
 MAX_UDP_RECV = 65535
-MAX_UDP_PAYLOAD = 65503
+FRAME_HEADER = struct.Struct(">I")  # 4-byte big-endian length prefix
+
+# Processed frames are sent back as MTU-sized fragments, each prefixed with
+# (frame_id, frag_idx, frag_count), so Wi-Fi never sees IP-fragmented datagrams
+FRAG_HEADER = struct.Struct(">IHH")
+FRAG_PAYLOAD = 1400
+
+# Micro-batching: YOLO runs on up to BATCH_SIZE frames that arrive within
+# BATCH_WINDOW_SEC of the first one
+BATCH_SIZE = 4
+BATCH_WINDOW_SEC = 0.005
+
+# TensorRT engine input size; ensure_engine records its export args in
+# <engine>.json so stale static or smaller-batch engines get rebuilt
+ENGINE_IMGSZ = 640
+ENGINE_META_SUFFIX = ".json"
+
+# Depth of the queues between the decode, inference and encode stages
+STAGE_QUEUE_MAXSIZE = 2
+
+MSG_WAITFORONE = 0x10000  # Linux; not exported by the socket module
+SO_ATTACH_REUSEPORT_CBPF = 51  # Linux; not exported by the socket module
+SKF_NET_OFF = -0x100000       # BPF offset base for the IP header
 
 # Ollama VLM settings
-OLLAMA_URL = "http://localhost:11434/api/chat"
+OLLAMA_HOST = "localhost"
+OLLAMA_PORT = 11434
+OLLAMA_PATH = "/api/chat"
 OLLAMA_MODEL = "qwen3-vl:2b"
 OLLAMA_PROMPT = (
     "Be EXTREMELY concise. Use no more than 2 short paragraphs total. "
@@ -54,8 +90,22 @@ BOX_COLORS = [
 ]
 
 
-def load_model(model_path, conf_threshold):
-    """Load YOLOv8 model, exporting to TensorRT FP16 engine if needed."""
+def read_engine_meta(engine_path):
+    """Return the export args ensure_engine stored next to engine_path.
+    Engines without them (e.g. built by an older version of this script)
+    are assumed to be static batch-1 ENGINE_IMGSZ engines."""
+    try:
+        with open(engine_path + ENGINE_META_SUFFIX) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"batch": 1, "dynamic": False, "imgsz": ENGINE_IMGSZ}
+
+
+def ensure_engine(model_path, batch_size=BATCH_SIZE):
+    """Export model_path to a TensorRT FP16 engine with a dynamic batch
+    dimension up to batch_size, unless a matching one already exists.
+    Returns (engine_path, engine_meta); engine_meta["batch"] is the largest
+    batch the engine accepts, clamped to batch_size."""
     from ultralytics import YOLO
 
     stem = os.path.splitext(model_path)[0]
@@ -63,67 +113,240 @@ def load_model(model_path, conf_threshold):
     onnx_path = stem + ".onnx"
 
     if model_path.endswith(".engine"):
+        # Prebuilt engine: can't re-export, so batch to what it accepts
         engine_path = model_path
-    elif os.path.isfile(engine_path):
-        print(f"Found existing TensorRT engine: {engine_path}")
-    else:
-        # Need to build engine — check for existing ONNX first
-        if os.path.isfile(onnx_path):
-            print(f"Found existing ONNX: {onnx_path}, exporting to TensorRT FP16...")
-            onnx_model = YOLO(onnx_path, task="detect")
-            onnx_model.export(format="engine", half=True)
-        else:
-            print(f"Exporting {model_path} to TensorRT FP16 (this takes several minutes on first run)...")
-            base_model = YOLO(model_path)
-            base_model.export(format="engine", half=True)
+        meta = read_engine_meta(engine_path)
+        if meta["batch"] < batch_size:
+            print(f"{engine_path} accepts batches of up to {meta['batch']}; "
+                  f"clamping --batch {batch_size} to {meta['batch']}")
+        meta["batch"] = min(batch_size, meta["batch"])
+        return engine_path, meta
+
+    have_engine = os.path.isfile(engine_path)
+    if have_engine:
+        meta = read_engine_meta(engine_path)
+        if meta["dynamic"] and meta["batch"] >= batch_size:
+            print(f"Found existing TensorRT engine: {engine_path}")
+            meta["batch"] = batch_size
+            return engine_path, meta
+
+    if os.path.isfile(model_path) or not (have_engine
+                                          or os.path.isfile(onnx_path)):
+        # Rebuilding needs the .pt; YOLO() downloads the stock weights if
+        # they are missing, as on a fresh box
+        if have_engine:
+            print(f"Existing TensorRT engine {engine_path} is static or "
+                  f"built for a smaller batch, rebuilding...")
+        print(f"Exporting {model_path} to TensorRT FP16 (this takes several minutes on first run)...")
+        base_model = YOLO(model_path)
+        base_model.export(format="engine", half=True, imgsz=ENGINE_IMGSZ,
+                          batch=batch_size, dynamic=True)
+        meta = {"batch": batch_size, "dynamic": True, "imgsz": ENGINE_IMGSZ}
+        with open(engine_path + ENGINE_META_SUFFIX, "w") as f:
+            json.dump(meta, f)
+    elif have_engine and meta["batch"] < batch_size:
+        # No .pt to rebuild from: run the engine as it is
+        print(f"{engine_path} accepts batches of up to {meta['batch']} and "
+              f"{model_path} is missing to rebuild it; clamping --batch "
+              f"{batch_size} to {meta['batch']}")
+    elif not have_engine:
+        # An ONNX keeps the shapes it was exported with, so the engine is
+        # treated as static batch-1 (read_engine_meta's default)
+        print(f"Found existing ONNX: {onnx_path}, exporting to TensorRT FP16...")
+        onnx_model = YOLO(onnx_path, task="detect")
+        onnx_model.export(format="engine", half=True)
+        meta = read_engine_meta(engine_path)
+
+    meta["batch"] = min(batch_size, meta["batch"])
+    return engine_path, meta
+
+
+def load_model(model_path, conf_threshold, batch_size=BATCH_SIZE):
+    """Load YOLOv8 model, exporting to TensorRT FP16 engine if needed.
+    Returns (model, engine_meta) as from ensure_engine."""
+    from ultralytics import YOLO
 
+    engine_path, meta = ensure_engine(model_path, batch_size)
     model = YOLO(engine_path, task="detect")
 
     model.conf = conf_threshold
 
     # Warm-up inference to pre-allocate GPU memory
     print("Running warm-up inference...")
-    warmup_img = np.zeros((640, 640, 3), dtype=np.uint8)
+    warmup_img = np.zeros((meta["imgsz"], meta["imgsz"], 3), dtype=np.uint8)
     model.predict(warmup_img, verbose=False)
     print("Model ready.")
 
-    return model
+    return model, meta
 
 
-def apply_processing(bgr_image, model):
-    """Run YOLOv8 detection and draw bounding boxes with class labels.
-    If model is None, return the image unmodified (passthrough)."""
+def load_gpu_decoder():
+    """Return a function decoding a uint8 JPEG array to a CUDA RGB CHW tensor via
+    torchvision's NVJPEG backend, or None if CUDA decoding is unavailable."""
+    try:
+        import torch
+        from torchvision.io import ImageReadMode, decode_jpeg
+    except ImportError:
+        return None
+    if not torch.cuda.is_available():
+        return None
+
+    def decode(jpeg_data):
+        raw = torch.from_numpy(jpeg_data)
+        return decode_jpeg(raw, mode=ImageReadMode.RGB, device="cuda")
+
+    print("Using NVJPEG GPU decode.")
+    return decode
+
+
+# Start-of-frame markers (baseline, progressive, lossless, arithmetic); the
+# rest of 0xC0-0xCF are DHT, JPG and DAC
+SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(jpeg_data):
+    """Return (width, height) from a JPEG's SOF header by walking the marker
+    segments, or None if it can't be found. Reads only the headers."""
+    n = len(jpeg_data)
+    i = 2  # past SOI
+    while i + 9 <= n:
+        if jpeg_data[i] != 0xFF:
+            return None
+        marker = int(jpeg_data[i + 1])
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in SOF_MARKERS:
+            height = (int(jpeg_data[i + 5]) << 8) | int(jpeg_data[i + 6])
+            width = (int(jpeg_data[i + 7]) << 8) | int(jpeg_data[i + 8])
+            return width, height
+        if marker == 0xDA:  # SOS: entropy-coded data follows, no SOF seen
+            return None
+        i += 2 + ((int(jpeg_data[i + 2]) << 8) | int(jpeg_data[i + 3]))
+    return None
+
+
+def decode_frame(jpeg_data, gpu_decode, engine_meta):
+    """Decode a JPEG (uint8 array view) to (bgr_image, gpu_tensor).
+    gpu_tensor is a 1x3xHxW float RGB batch already on the GPU, ready for
+    YOLO, or None when decoding on the CPU. The size is read from the JPEG
+    header first so a frame is only GPU-decoded if the tensor will fit the
+    engine; a frame NVJPEG rejects is decoded on the CPU instead."""
+    if gpu_decode is not None:
+        size = jpeg_size(jpeg_data)
+        imgsz = engine_meta["imgsz"]
+        # Tensor input skips YOLO's letterbox, so frames larger than the
+        # engine was exported for need the CPU path. A dynamic engine takes
+        # smaller frames as they are if stride-aligned; for a static one
+        # they are padded to imgsz x imgsz below
+        fits = (size is not None
+                and size[0] <= imgsz and size[1] <= imgsz)
+        if fits and engine_meta["dynamic"]:
+            fits = size[0] % 32 == 0 and size[1] % 32 == 0
+        rgb = None
+        if fits:
+            try:
+                rgb = gpu_decode(jpeg_data)
+            except RuntimeError:
+                pass  # e.g. a variant NVJPEG can't handle
+        if rgb is not None:
+            bgr = rgb.flip(0).permute(1, 2, 0).contiguous().cpu().numpy()
+            batch = rgb.unsqueeze(0).float().div_(255.0)
+            if not engine_meta["dynamic"]:
+                # Pad right/bottom with YOLO's letterbox gray so the box
+                # coordinates still match the unpadded frame
+                import torch.nn.functional as F
+                batch = F.pad(batch, (0, imgsz - batch.shape[3],
+                                      0, imgsz - batch.shape[2]),
+                              value=114 / 255.0)
+            return bgr, batch
+
+    return decode_jpeg_cpu(jpeg_data), None
+
+
+def decode_jpeg_cpu(jpeg_data):
+    """Decode to BGR with libjpeg-turbo when available, else OpenCV."""
+    if _turbo is not None:
+        try:
+            return _turbo.decode(jpeg_data, pixel_format=TJPF_BGR)
+        except OSError:
+            return None
+    return cv2.imdecode(jpeg_data, cv2.IMREAD_COLOR)
+
+
+def encode_jpeg(image, quality):
+    """JPEG-encode a BGR image with libjpeg-turbo when available, else
+    OpenCV. Returns a bytes-like buffer, or None on failure."""
+    if _turbo is not None:
+        return _turbo.encode(image, quality=quality, pixel_format=TJPF_BGR,
+                             jpeg_subsample=TJSAMP_420)
+    ok, encoded = cv2.imencode(
+        ".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.reshape(-1) if ok else None
+
+
+def run_inference(bgr_images, model, gpu_frames=None):
+    """Run YOLOv8 detection on a batch of frames in one predict call and
+    return the per-frame results. If every frame has a GPU tensor in
+    gpu_frames, those are batched and fed to YOLO instead of the BGR
+    images so the frames are not uploaded to the GPU a second time.
+    If model is None, return None (passthrough)."""
     if model is None:
+        return None
+
+    source = bgr_images
+    if gpu_frames and all(f is not None for f in gpu_frames):
+        if len({f.shape for f in gpu_frames}) == 1:
+            import torch
+            source = torch.cat(gpu_frames)
+
+    return model.predict(source, verbose=False)
+
+
+def rect_polys(x1, y1, x2, y2):
+    """Corner arrays -> (N, 4, 2) int32 closed rectangles for polylines/fillPoly."""
+    return np.stack([x1, y1, x2, y1, x2, y2, x1, y2],
+                    axis=1).reshape(-1, 4, 2).astype(np.int32)
+
+
+def draw_detections(bgr_image, result, names):
+    """Draw one YOLO result's boxes and class labels in place on bgr_image.
+    Boxes are grouped by class so each class costs one polylines and one
+    fillPoly call instead of two rectangle calls per box."""
+    boxes = result.boxes
+    if len(boxes) == 0:
         return bgr_image
 
-    results = model.predict(bgr_image, verbose=False)
-    annotated = bgr_image.copy()
+    xyxy = boxes.xyxy.cpu().numpy().astype(np.int32)
+    cls_ids = boxes.cls.cpu().numpy().astype(np.int32)
 
-    for box in results[0].boxes:
-        x1, y1, x2, y2 = box.xyxy[0].int().tolist()
-        cls_id = int(box.cls[0])
-        class_name = model.names[cls_id]
+    for cls_id in np.unique(cls_ids):
+        class_name = names[int(cls_id)]
         color = BOX_COLORS[cls_id % len(BOX_COLORS)]
+        x1, y1, x2, y2 = xyxy[cls_ids == cls_id].T
 
-        # Bounding box
-        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
+        # Bounding boxes
+        cv2.polylines(bgr_image, list(rect_polys(x1, y1, x2, y2)), True,
+                      color, 2)
 
-        # Label background + text
+        # Label backgrounds + text
         (tw, th), _ = cv2.getTextSize(class_name, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
-        cv2.rectangle(annotated, (x1, y1 - th - 8), (x1 + tw + 4, y1), color, -1)
-        cv2.putText(annotated, class_name, (x1 + 2, y1 - 4),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        cv2.fillPoly(bgr_image,
+                     list(rect_polys(x1, y1 - th - 8, x1 + tw + 4, y1)), color)
+        for lx, ly in zip(x1.tolist(), y1.tolist()):
+            cv2.putText(bgr_image, class_name, (lx + 2, ly - 4),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
 
-    return annotated
+    return bgr_image
 
 
 # ---------------------------------------------------------------------------
 # VLM (Ollama) helpers
 # ---------------------------------------------------------------------------
 
-def query_ollama(jpeg_bytes):
-    """Send a JPEG frame to the local Ollama VLM and return the response text."""
-    b64_img = base64.b64encode(jpeg_bytes).decode("ascii")
+def query_ollama(b64_img, conn):
+    """Send a base64 JPEG frame to the local Ollama VLM over the kept-alive
+    connection conn and return the response text."""
     payload = json.dumps({
         "model": OLLAMA_MODEL,
         "stream": False,
@@ -137,24 +360,25 @@ def query_ollama(jpeg_bytes):
         ],
     }).encode("utf-8")
 
-    req = urllib.request.Request(
-        OLLAMA_URL,
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
     try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            body = json.loads(resp.read())
+        conn.request("POST", OLLAMA_PATH, body=payload,
+                     headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        body = json.loads(resp.read())
+        if resp.status != 200:
+            return f"[ERROR] HTTP {resp.status}: {body.get('error', '')}"
         return body["message"]["content"].strip()
     except Exception as exc:
+        conn.close()  # reconnects on the next request
         return f"[ERROR] {exc}"
 
 
-def setup_vlm_logger():
-    """Create a file logger under vlm_logs/ for this run."""
+def setup_vlm_logger(suffix=""):
+    """Create a file logger under vlm_logs/ for this run. suffix tells
+    apart the logs of several worker processes."""
     os.makedirs("vlm_logs", exist_ok=True)
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_path = f"vlm_logs/vlm_analysis_{ts}.log"
+    log_path = f"vlm_logs/vlm_analysis_{ts}{suffix}.log"
 
     logger = logging.getLogger("vlm_analysis")
     logger.setLevel(logging.INFO)
@@ -168,17 +392,18 @@ def setup_vlm_logger():
 
 def vlm_analysis_thread(frame_queue, reply_addr_holder, vlm_port, logger,
                         running_event):
-    """Daemon thread: pull JPEG from queue, query Ollama, log, send via UDP."""
+    """Daemon thread: pull base64 JPEG from queue, query Ollama, log, send via UDP."""
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    conn = http.client.HTTPConnection(OLLAMA_HOST, OLLAMA_PORT, timeout=120)
 
     while running_event.is_set():
         try:
-            jpeg_data = frame_queue.get(timeout=1.0)
+            b64_img = frame_queue.get(timeout=1.0)
         except Exception:
             continue
 
         ts = datetime.now().strftime("%H:%M:%S")
-        result = query_ollama(jpeg_data)
+        result = query_ollama(b64_img, conn)
 
         msg = f"[VLM {ts}] {result}"
         logger.info(result)
@@ -192,6 +417,7 @@ def vlm_analysis_thread(frame_queue, reply_addr_holder, vlm_port, logger,
             except OSError:
                 pass
 
+    conn.close()
     sock.close()
 
 
@@ -199,12 +425,263 @@ def vlm_analysis_thread(frame_queue, reply_addr_holder, vlm_port, logger,
 # Main processing loop
 # ---------------------------------------------------------------------------
 
+def encode_and_send(send_sock, processed, jpeg_quality, frame_id):
+    """JPEG-encode a processed frame and send it on the connected send_sock
+    as FRAG_PAYLOAD-sized fragments. Only a frame needing more fragments
+    than the 16-bit fragment count can number is dropped."""
+    encoded = encode_jpeg(processed, jpeg_quality)
+    if encoded is None:
+        return
+
+    # Scatter-gather send: each fragment header and its slice of the encoder
+    # output go out as one datagram without copying the JPEG
+    payload = memoryview(encoded)
+    frag_count = -(-len(payload) // FRAG_PAYLOAD)
+    if frag_count > 0xFFFF:
+        return
+    try:
+        for idx in range(frag_count):
+            start = idx * FRAG_PAYLOAD
+            send_sock.sendmsg([FRAG_HEADER.pack(frame_id, idx, frag_count),
+                               payload[start:start + FRAG_PAYLOAD]])
+    except OSError:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Pipeline stages (decode runs in the socket loop)
+# ---------------------------------------------------------------------------
+
+def put_latest(q, item):
+    """Put item on a bounded queue, discarding the oldest entry if full, so
+    a slow downstream stage drops stale frames instead of adding latency."""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except Full:
+            try:
+                q.get_nowait()
+            except Empty:
+                pass
+
+
+def inference_stage(in_queue, out_queue, model, running_event):
+    """Thread: pop decoded batches, run YOLO, push (frames, results, dest)."""
+    while running_event.is_set():
+        try:
+            bgr_frames, gpu_frames, dest = in_queue.get(timeout=1.0)
+        except Empty:
+            continue
+        # A failed batch is dropped; letting the exception end this thread
+        # would leave the main loop decoding into a queue nobody drains
+        try:
+            results = run_inference(bgr_frames, model, gpu_frames)
+        except Exception:
+            print("Inference error, dropping batch:")
+            traceback.print_exc()
+            continue
+        out_queue.put((bgr_frames, results, dest))
+
+
+def encode_stage(in_queue, send_sock, jpeg_quality, names, running_event,
+                 worker_index=0, workers=1):
+    """Thread: pop inference output, draw boxes, JPEG-encode and send.
+    Worker i numbers its frames i, i + workers, ... so frame IDs from
+    several workers never collide on the return path."""
+    connected_to = None
+    frame_id = worker_index
+    while running_event.is_set():
+        try:
+            bgr_frames, results, dest = in_queue.get(timeout=1.0)
+        except Empty:
+            continue
+        # Connect once so each send reuses the cached route and skips
+        # passing the address
+        if dest != connected_to:
+            try:
+                send_sock.connect(dest)
+            except OSError:
+                continue
+            connected_to = dest
+        for i, bgr in enumerate(bgr_frames):
+            try:
+                if results is not None:
+                    draw_detections(bgr, results[i], names)
+                encode_and_send(send_sock, bgr, jpeg_quality, frame_id)
+            except Exception:
+                print("Encode error, dropping frame:")
+                traceback.print_exc()
+            frame_id = (frame_id + workers) & 0xFFFFFFFF
+
+
+# ---------------------------------------------------------------------------
+# Batched receive (recvmmsg via ctypes)
+# ---------------------------------------------------------------------------
+
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IoVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+class MmsgReceiver:
+    """Receives up to `slots` UDP datagrams per syscall with Linux recvmmsg.
+    CPython's socket module has no recvmmsg wrapper, so libc is called
+    through ctypes against preallocated buffers."""
+
+    _libc = None
+
+    @classmethod
+    def available(cls):
+        if cls._libc is None:
+            path = ctypes.util.find_library("c")
+            try:
+                libc = ctypes.CDLL(path, use_errno=True)
+                libc.recvmmsg  # AttributeError on non-Linux libcs
+            except (OSError, AttributeError):
+                cls._libc = False
+            else:
+                cls._libc = libc
+        return bool(cls._libc)
+
+    def __init__(self, sock, slots):
+        if not self.available():
+            raise OSError("recvmmsg is not available on this platform")
+        self.fd = sock.fileno()
+        self.slots = slots
+        self.bufs = [np.empty(MAX_UDP_RECV, dtype=np.uint8)
+                     for _ in range(slots)]
+        self.names = [ctypes.create_string_buffer(16)  # sockaddr_in
+                      for _ in range(slots)]
+        self.iovs = (_IoVec * slots)()
+        self.msgs = (_MMsgHdr * slots)()
+        for i in range(slots):
+            self.iovs[i].iov_base = self.bufs[i].ctypes.data
+            self.iovs[i].iov_len = MAX_UDP_RECV
+            hdr = self.msgs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(self.names[i])
+            hdr.msg_iov = ctypes.pointer(self.iovs[i])
+            hdr.msg_iovlen = 1
+
+    def recv(self, vlen, flags, offset=0):
+        """Return a list of (uint8 view, (ip, port)) for up to vlen datagrams,
+        received into the slots starting at offset. The views alias the
+        receive buffers and are overwritten by the next call that fills the
+        same slots, so process (or copy) them first."""
+        vlen = min(vlen, self.slots - offset)
+        for i in range(offset, offset + vlen):
+            self.msgs[i].msg_hdr.msg_namelen = 16
+        msgs = ctypes.byref(self.msgs, offset * ctypes.sizeof(_MMsgHdr))
+        n = self._libc.recvmmsg(self.fd, msgs, vlen, flags, None)
+        if n < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        out = []
+        for i in range(offset, offset + n):
+            data = self.bufs[i][:self.msgs[i].msg_len]
+            name = self.names[i].raw
+            addr = (socket.inet_ntoa(name[4:8]),
+                    int.from_bytes(name[2:4], "big"))
+            out.append((data, addr))
+        return out
+
+
+def recv_batch(recv_sock, batch_size, mmsg=None, slots=None):
+    """Block for one datagram, then collect up to batch_size - 1 more that
+    arrive within BATCH_WINDOW_SEC. Returns (datagrams, last_addr).
+    With an MmsgReceiver, everything already queued comes back in one
+    recvmmsg call and only a short batch waits for more. Otherwise each
+    datagram is read into one of the preallocated uint8 arrays in slots.
+    Either way the datagrams are views valid until the next call."""
+    if mmsg is not None:
+        received = mmsg.recv(batch_size, MSG_WAITFORONE)
+        deadline = time.monotonic() + BATCH_WINDOW_SEC
+        while len(received) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select(
+                    [recv_sock], [], [], remaining)[0]:
+                break
+            try:
+                # Fill the slots after the ones already holding this
+                # batch so their views are not overwritten
+                received += mmsg.recv(batch_size - len(received),
+                                      socket.MSG_DONTWAIT,
+                                      offset=len(received))
+            except BlockingIOError:
+                pass
+        return [data for data, _ in received], received[-1][1]
+
+    nbytes, addr = recv_sock.recvfrom_into(slots[0])
+    batch = [slots[0][:nbytes]]
+
+    deadline = time.monotonic() + BATCH_WINDOW_SEC
+    while len(batch) < batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        recv_sock.settimeout(remaining)
+        slot = slots[len(batch)]
+        try:
+            nbytes, addr = recv_sock.recvfrom_into(slot)
+        except OSError:
+            break
+        batch.append(slot[:nbytes])
+    recv_sock.settimeout(None)
+
+    return batch, addr
+
+
+class _SockFilter(ctypes.Structure):
+    _fields_ = [("code", ctypes.c_uint16), ("jt", ctypes.c_uint8),
+                ("jf", ctypes.c_uint8), ("k", ctypes.c_uint32)]
+
+
+class _SockFprog(ctypes.Structure):
+    _fields_ = [("len", ctypes.c_ushort),
+                ("filter", ctypes.POINTER(_SockFilter))]
+
+
+def attach_source_ip_steering(sock, workers):
+    """Attach a classic BPF program to the SO_REUSEPORT group that picks
+    socket (source IPv4 address % workers), so each camera's frames stay
+    on one worker and arrive in order."""
+    prog = (_SockFilter * 3)(
+        _SockFilter(0x20, 0, 0, (SKF_NET_OFF + 12) & 0xFFFFFFFF),  # ld [saddr]
+        _SockFilter(0x94, 0, 0, workers),                          # mod #workers
+        _SockFilter(0x16, 0, 0, 0),                                # ret a
+    )
+    fprog = _SockFprog(len(prog), prog)
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_REUSEPORT_CBPF,
+                    bytes(fprog))
+
+
 def run_processor(port, return_port, reply_host, jpeg_quality, model,
-                  vlm_port, vlm_interval):
+                  vlm_port, vlm_interval, batch_size=BATCH_SIZE,
+                  workers=1, worker_index=0, engine_meta=None):
     recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    if workers > 1:
+        recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     recv_sock.bind(("0.0.0.0", port))
+    if workers > 1:
+        attach_source_ip_steering(recv_sock, workers)
 
     send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     send_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
@@ -212,91 +689,106 @@ def run_processor(port, return_port, reply_host, jpeg_quality, model,
     print(f"Jetson processor listening on UDP port {port} ...")
     print(f"Will return processed frames on port {return_port}")
 
-    # VLM setup
+    # VLM setup. The thread starts with the first frame, so with several
+    # workers only those that actually receive a stream query the VLM
+    # (source-IP steering decides which, not the worker index)
     vlm_queue = Queue(maxsize=VLM_QUEUE_MAXSIZE)
-    vlm_logger = setup_vlm_logger()
     running_event = threading.Event()
     running_event.set()
     reply_addr_holder = [reply_host]  # mutable list shared with VLM thread
 
-    vlm_thread = threading.Thread(
-        target=vlm_analysis_thread,
-        args=(vlm_queue, reply_addr_holder, vlm_port, vlm_logger,
-              running_event),
-        daemon=True,
-    )
-    vlm_thread.start()
-
     reply_addr = reply_host
     connected = False
     last_vlm_time = 0.0
 
+    # GPU decode only pays off when the frame is going to YOLO anyway
+    gpu_decode = load_gpu_decoder() if model is not None else None
+
+    # Passthrough has nothing to batch, so don't wait for more frames
+    if model is None:
+        batch_size = 1
+
+    # Datagrams are received into these buffers and decoded in place, so
+    # no per-packet bytes object is allocated
+    mmsg = None
+    slots = None
+    if MmsgReceiver.available():
+        mmsg = MmsgReceiver(recv_sock, max(batch_size, 1))
+        print("Using recvmmsg batched receive.")
+    else:
+        slots = [np.empty(MAX_UDP_RECV, dtype=np.uint8)
+                 for _ in range(max(batch_size, 1))]
+
+    # Decode (this loop) -> inference -> encode, each on its own thread so
+    # CPU decode/encode overlap with GPU inference
+    infer_queue = Queue(maxsize=STAGE_QUEUE_MAXSIZE)
+    encode_queue = Queue(maxsize=STAGE_QUEUE_MAXSIZE)
+    names = model.names if model is not None else None
+    for target, stage_args in (
+        (inference_stage, (infer_queue, encode_queue, model, running_event)),
+        (encode_stage, (encode_queue, send_sock, jpeg_quality, names,
+                        running_event, worker_index, workers)),
+    ):
+        threading.Thread(target=target, args=stage_args, daemon=True).start()
+
     while True:
         try:
-            data, addr = recv_sock.recvfrom(MAX_UDP_RECV)
+            datagrams, addr = recv_batch(recv_sock, batch_size, mmsg, slots)
         except OSError:
             continue
 
         if not connected:
             print(f"Receiving from {addr}")
             connected = True
+            suffix = f"_w{worker_index}" if workers > 1 else ""
+            threading.Thread(
+                target=vlm_analysis_thread,
+                args=(vlm_queue, reply_addr_holder, vlm_port,
+                      setup_vlm_logger(suffix), running_event),
+                daemon=True,
+            ).start()
 
         if reply_addr is None:
             reply_addr = addr[0]
             reply_addr_holder[0] = reply_addr
             print(f"Reply target set to {reply_addr}:{return_port}")
 
-        # Parse frame
-        if len(data) < 4:
-            continue
-        frame_len = struct.unpack(">I", data[:4])[0]
-        jpeg_data = data[4:]
-        if len(jpeg_data) != frame_len:
-            continue
-
-        # Feed VLM at configured interval (original un-annotated JPEG)
-        now = time.monotonic()
-        if now - last_vlm_time >= vlm_interval:
-            last_vlm_time = now
-            try:
-                vlm_queue.put_nowait(jpeg_data)
-            except Full:
-                pass  # queue full, silently drop
-
-        # Decode
-        bgr = cv2.imdecode(
-            np.frombuffer(jpeg_data, dtype=np.uint8), cv2.IMREAD_COLOR)
-        if bgr is None:
-            continue
+        bgr_frames = []
+        gpu_frames = []
+        for data in datagrams:
+            # Parse frame
+            if len(data) < 4:
+                continue
+            frame_len = FRAME_HEADER.unpack_from(data)[0]
+            jpeg_data = data[4:]
+            if len(jpeg_data) != frame_len:
+                continue
 
-        # Process
-        processed = apply_processing(bgr, model)
+            # Feed VLM at configured interval (original un-annotated JPEG)
+            now = time.monotonic()
+            if now - last_vlm_time >= vlm_interval:
+                last_vlm_time = now
+                # Base64 here so the VLM thread only builds JSON and POSTs
+                try:
+                    vlm_queue.put_nowait(
+                        base64.b64encode(jpeg_data).decode("ascii"))
+                except Full:
+                    pass  # queue full, silently drop
+
+            # Decode
+            bgr, gpu_frame = decode_frame(jpeg_data, gpu_decode, engine_meta)
+            if bgr is None:
+                continue
+            bgr_frames.append(bgr)
+            gpu_frames.append(gpu_frame)
 
-        # Re-encode as JPEG
-        ok, encoded = cv2.imencode(
-            ".jpg", processed, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
-        if not ok:
+        if not bgr_frames:
             continue
 
-        jpeg_bytes = encoded.tobytes()
-
-        # If too large, retry at lower quality
-        if len(jpeg_bytes) + 4 > MAX_UDP_PAYLOAD:
-            ok, encoded = cv2.imencode(
-                ".jpg", processed,
-                [cv2.IMWRITE_JPEG_QUALITY, max(20, jpeg_quality - 30)])
-            if not ok:
-                continue
-            jpeg_bytes = encoded.tobytes()
-            if len(jpeg_bytes) + 4 > MAX_UDP_PAYLOAD:
-                continue  # still too big, drop
-
-        # Send back
-        header = struct.pack(">I", len(jpeg_bytes))
-        try:
-            send_sock.sendto(header + jpeg_bytes, (reply_addr, return_port))
-        except OSError:
-            pass
+        # Hand the batch to the inference stage (one predict call per batch);
+        # if it is behind, the oldest pending batch is dropped
+        put_latest(infer_queue,
+                   (bgr_frames, gpu_frames, (reply_addr, return_port)))
 
 
 def main():
@@ -315,20 +807,57 @@ def main():
                     help="Path to YOLOv8 .pt or .engine file (default yolov8n.pt)")
     ap.add_argument("--conf", type=float, default=0.25,
                     help="Detection confidence threshold (default 0.25)")
+    ap.add_argument("--batch", type=int, default=BATCH_SIZE,
+                    help=f"Max frames per YOLO batch (default {BATCH_SIZE}); "
+                         "the .engine is rebuilt if it accepts fewer")
     ap.add_argument("--vlm-port", type=int, default=VLM_UDP_PORT,
                     help=f"UDP port for VLM analysis text (default {VLM_UDP_PORT})")
     ap.add_argument("--vlm-interval", type=float, default=VLM_INTERVAL_SEC,
                     help=f"Seconds between VLM queries (default {VLM_INTERVAL_SEC})")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Worker processes sharing the port via SO_REUSEPORT; "
+                         "frames are split by source IP, so this only helps "
+                         "with several cameras (default 1)")
     args = ap.parse_args()
 
+    if args.workers <= 1:
+        worker_main(args, 0)
+        return
+
+    # Build the engine once up front so workers don't race to export it
+    if args.yolo:
+        args.model, meta = ensure_engine(args.model, args.batch)
+        args.batch = meta["batch"]
+
+    ctx = multiprocessing.get_context("spawn")  # fresh CUDA context per worker
+    procs = [ctx.Process(target=worker_main, args=(args, i), daemon=True)
+             for i in range(args.workers)]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        for proc in procs:
+            proc.terminate()
+
+
+def worker_main(args, index):
+    """Load the model and run one processing pipeline. Each worker that
+    receives a stream runs its own rate-limited VLM thread."""
     model = None
+    meta = None
+    batch_size = args.batch
     if args.yolo:
-        model = load_model(args.model, args.conf)
-    else:
+        model, meta = load_model(args.model, args.conf, args.batch)
+        batch_size = meta["batch"]
+    elif index == 0:
         print("YOLO disabled (passthrough mode). Use --yolo to enable detection.")
 
     run_processor(args.port, args.return_port, args.reply_host,
-                  args.jpeg_quality, model, args.vlm_port, args.vlm_interval)
+                  args.jpeg_quality, model, args.vlm_port, args.vlm_interval,
+                  batch_size, args.workers, worker_index=index,
+                  engine_meta=meta)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ CHUNK = 1024  # Size of each audio packet (in frames)
 FORMAT = pyaudio.paInt16  # Audio data format (16-bit integer)
 CHANNELS = 1  # Single channel (mono)
 RATE = 16000  # Sampling rate (16 kHz)
+PREFILL_FRAMES = RATE * 70 // 1000  # ~70 ms of silence queued before playback
 
 # Create a PyAudio object to handle audio streaming
 p = pyaudio.PyAudio()
@@ -14,27 +15,39 @@ p = pyaudio.PyAudio()
 stream = p.open(format=FORMAT,
                 channels=CHANNELS,
                 rate=RATE,
-                output=True) # 'output=True' indicates this is a playback stream
+                output=True, # 'output=True' indicates this is a playback stream
+                frames_per_buffer=CHUNK) # one UDP packet per PortAudio buffer
 
 # Configure the UDP server
 server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+# Large receive buffer so bursts aren't dropped while stream.write blocks
+server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
 # Bind the socket to all available network interfaces on port 8888
 server_socket.bind(('0.0.0.0', 8888))
 ip_address = server_socket.getsockname()[0]
 print(f"Waiting for audio data stream on {ip_address}:8888...")
 
 try:
+    # Lock onto the first sender's IP. Not its port: the ESP32 sends from an
+    # unbound WiFiUDP, so the source port changes after every reconnect
+    data, addr = server_socket.recvfrom(CHUNK * 2)
+    sender_ip = addr[0]
+
+    # Cushion against network jitter on the first packets (avoids a startup click)
+    stream.write(bytes(PREFILL_FRAMES * CHANNELS * 2))
+
     # Continuous loop to receive and play audio
     while True:
-        # Receive data from the client. The buffer size is CHUNK * 2 because each int16 sample is 2 bytes.
-        data, addr = server_socket.recvfrom(CHUNK * 2)
-
         # If no data is received, break out of the loop
         if not data:
             break
 
         # Write the received audio data to the output stream for playback
-        stream.write(data)
+        if addr[0] == sender_ip:
+            stream.write(data)
+
+        # Receive the next packet. The buffer size is CHUNK * 2 because each int16 sample is 2 bytes.
+        data, addr = server_socket.recvfrom(CHUNK * 2)
 
 except KeyboardInterrupt:
     # Handle program termination with Ctrl+C
@@ -5,34 +5,116 @@ and displays the received MJPEG stream.
 
 Usage:
     python3 receiver.py --port 9000
+    python3 receiver.py --port 9000 --fb /dev/fb0   # console, no desktop
 """
 
 import argparse
+import mmap
+import os
 import socket
 import struct
 
 import cv2
 import numpy as np
 
+try:
+    from turbojpeg import TJPF_BGR, TurboJPEG
+    _turbo = TurboJPEG()  # raises if libturbojpeg itself is missing
+except (ImportError, OSError, RuntimeError):
+    _turbo = None
+
 MAX_UDP_RECV = 65535
+FRAME_HEADER = struct.Struct(">I")  # 4-byte big-endian length prefix
+
+
+class FramebufferDisplay:
+    """Shows frames by writing them straight into the Linux framebuffer,
+    bypassing X11/Wayland. Needs a console session (no desktop on top)."""
+
+    def __init__(self, device="/dev/fb0"):
+        sysfs = os.path.join("/sys/class/graphics", os.path.basename(device))
+        with open(os.path.join(sysfs, "virtual_size")) as f:
+            self.width, self.height = map(int, f.read().split(","))
+        with open(os.path.join(sysfs, "bits_per_pixel")) as f:
+            bpp = int(f.read())
+        with open(os.path.join(sysfs, "stride")) as f:
+            stride = int(f.read())
+        if bpp not in (16, 32):
+            raise ValueError(f"Unsupported framebuffer depth: {bpp} bpp")
+
+        self._fd = os.open(device, os.O_RDWR)
+        self._mm = mmap.mmap(self._fd, stride * self.height)
+
+        # Pixel view over the mapped scanout memory (rows may be padded)
+        channels = bpp // 8
+        rows = np.frombuffer(self._mm, dtype=np.uint8).reshape(self.height, stride)
+        self._screen = rows[:, :self.width * channels].reshape(
+            self.height, self.width, channels)
+        self._code = cv2.COLOR_BGR2BGRA if bpp == 32 else cv2.COLOR_BGR2BGR565
+        self._scaled = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        print(f"Framebuffer {device}: {self.width}x{self.height} @ {bpp} bpp")
+
+    def show(self, frame):
+        """Scale frame to the panel and convert it directly into scanout memory."""
+        if frame.shape[:2] != (self.height, self.width):
+            cv2.resize(frame, (self.width, self.height), dst=self._scaled)
+            frame = self._scaled
+        cv2.cvtColor(frame, self._code, dst=self._screen)
+
+    def close(self):
+        del self._screen
+        self._mm.close()
+        os.close(self._fd)
+
+
+def decode_jpeg(jpeg_data):
+    """Decode to BGR with libjpeg-turbo when available, else OpenCV."""
+    if _turbo is not None:
+        try:
+            return _turbo.decode(jpeg_data, pixel_format=TJPF_BGR)
+        except OSError:
+            return None
+    return cv2.imdecode(jpeg_data, cv2.IMREAD_COLOR)
 
 
-def start_receiver(port):
+def start_receiver(port, fb_device=None):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
     sock.bind(("0.0.0.0", port))
     print(f"Base station listening on UDP port {port} ...")
 
-    # Set up fullscreen window for DSI display
     window_name = "Base Station - Live Feed"
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-
+    if fb_device is not None:
+        fb = FramebufferDisplay(fb_device)
+        print("Press Ctrl+C to quit")
+    else:
+        # Set up fullscreen window for DSI display
+        fb = None
+        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+        cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    # One receive buffer reused for every datagram (no per-packet allocation)
+    scratch = np.empty(MAX_UDP_RECV, dtype=np.uint8)
+
+    try:
+        receive_loop(sock, scratch, fb, window_name)
+    except KeyboardInterrupt:
+        pass
+    print("Quitting ...")
+    sock.close()
+    if fb is not None:
+        fb.close()
+    else:
+        cv2.destroyAllWindows()
+
+
+def receive_loop(sock, scratch, fb, window_name):
+    """Receive, decode and display frames until 'q' is pressed."""
     connected = False
     while True:
         try:
-            data, addr = sock.recvfrom(MAX_UDP_RECV)
+            nbytes, addr = sock.recvfrom_into(scratch)
         except OSError:
             continue
 
@@ -40,32 +122,34 @@ def start_receiver(port):
             print(f"Receiving from {addr}")
             connected = True
 
-        if len(data) < 4:
+        if nbytes < 4:
+            continue
+        frame_len = FRAME_HEADER.unpack_from(scratch)[0]
+        if nbytes - 4 != frame_len:
             continue
-        frame_len = struct.unpack(">I", data[:4])[0]
-        jpeg_data = data[4:]
-        if len(jpeg_data) != frame_len:
+
+        frame = decode_jpeg(scratch[4:nbytes])
+        if fb is not None:
+            if frame is not None:
+                fb.show(frame)
             continue
 
-        frame = cv2.imdecode(
-            np.frombuffer(jpeg_data, dtype=np.uint8), cv2.IMREAD_COLOR
-        )
         if frame is not None:
             cv2.imshow(window_name, frame)
 
         if cv2.waitKey(1) & 0xFF == ord("q"):
-            print("Quitting ...")
-            sock.close()
-            cv2.destroyAllWindows()
             return
 
 
 def main():
     parser = argparse.ArgumentParser(description="RPi Base Station (receiver)")
     parser.add_argument("--port", type=int, default=9000, help="Port (default 9000)")
+    parser.add_argument("--fb", default=None, metavar="DEVICE",
+                        help="Draw straight to a framebuffer device (e.g. /dev/fb0) "
+                             "instead of an OpenCV window")
     args = parser.parse_args()
 
-    start_receiver(args.port)
+    start_receiver(args.port, args.fb)
 
 
 if __name__ == "__main__":
@@ -8,132 +8,361 @@ Usage:
     python3 receiver_deskew.py --port 9000
     python3 receiver_deskew.py --port 9000 --single-tag 0
     python3 receiver_deskew.py --port 9000 --tags 0,1,2,3
+    python3 receiver_deskew.py --port 9000 --detect-scale 1.0   # tiny tags
 """
 
 import argparse
+import ctypes
+import ctypes.util
+import os
+import selectors
 import socket
 import struct
 import threading
+import time
 import tkinter as tk
+from dataclasses import dataclass
 from datetime import datetime
+from queue import Empty, Full, Queue
 from tkinter import ttk
 
 import cv2
 import numpy as np
 from PIL import Image, ImageTk
 
+try:
+    from turbojpeg import TJPF_RGB, TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+# numba is optional — the geometry kernels below also run as plain Python
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # Display size for each panel — sized to fit 800x480 DSI display
 DISPLAY_W = 380
 DISPLAY_H = 260
+FEED_INTERVAL_MS = 50  # GUI feed refresh (~20 fps); frames are decoded at this rate
 
 
+# libjpeg can decode at 1/2, 1/4 or 1/8 size in the IDCT, far cheaper than
+# a full decode plus resize; OpenCV exposes the same through IMREAD_REDUCED_*
+JPEG_SCALE_DENOMS = (8, 4, 2)
+CV_REDUCED_COLOR = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                    4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
 # Max UDP datagram we'll accept
 MAX_UDP_RECV = 65535
+FRAME_HEADER = struct.Struct(">I")  # 4-byte big-endian length prefix
+JPEG_SOI = b"\xff\xd8"  # start-of-image marker
+JPEG_EOI = b"\xff\xd9"  # end-of-image marker
+EOI_SEARCH_BYTES = 64   # EOI may be followed by padding or a trailing segment
+
+# Socket receive buffer; Linux clips SO_RCVBUF to net.core.rmem_max
+RCVBUF_BYTES = 12 * 1024 * 1024
+SO_RCVBUFFORCE = getattr(socket, "SO_RCVBUFFORCE", 33)  # Linux, needs CAP_NET_ADMIN
+
+RECV_BATCH = 16         # datagrams drained per recvmmsg call
+
+
+# ---------------------------------------------------------------------------
+# Networking
+# ---------------------------------------------------------------------------
+
+def set_receive_buffer(sock, size=RCVBUF_BYTES):
+    """Ask for a large receive buffer, bypassing rmem_max when privileged.
+    Returns the effective size and warns if the kernel clipped it."""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, size)
+    except OSError:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    # Linux reports double the requested value (bookkeeping overhead)
+    actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) // 2
+    if actual < size:
+        print(f"WARNING: UDP receive buffer is {actual // 1024} KiB, "
+              f"wanted {size // 1024} KiB; frames may drop under load.\n"
+              f"  Raise the limit with: sudo sysctl -w net.core.rmem_max={size}")
+    return actual
+
+
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IoVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+class MmsgReceiver:
+    """Receives up to `slots` UDP datagrams per syscall with Linux recvmmsg.
+    CPython's socket module has no recvmmsg wrapper, so libc is called
+    through ctypes against preallocated buffers."""
+
+    _libc = None
+
+    @classmethod
+    def available(cls):
+        if cls._libc is None:
+            path = ctypes.util.find_library("c")
+            try:
+                libc = ctypes.CDLL(path, use_errno=True)
+                libc.recvmmsg  # AttributeError on non-Linux libcs
+            except (OSError, AttributeError):
+                cls._libc = False
+            else:
+                cls._libc = libc
+        return bool(cls._libc)
+
+    def __init__(self, sock, slots):
+        if not self.available():
+            raise OSError("recvmmsg is not available on this platform")
+        self.fd = sock.fileno()
+        self.slots = slots
+        self.bufs = [bytearray(MAX_UDP_RECV) for _ in range(slots)]
+        self.names = [ctypes.create_string_buffer(16)  # sockaddr_in
+                      for _ in range(slots)]
+        self.iovs = (_IoVec * slots)()
+        self.msgs = (_MMsgHdr * slots)()
+        for i in range(slots):
+            c_buf = (ctypes.c_char * MAX_UDP_RECV).from_buffer(self.bufs[i])
+            self.iovs[i].iov_base = ctypes.addressof(c_buf)
+            self.iovs[i].iov_len = MAX_UDP_RECV
+            hdr = self.msgs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(self.names[i])
+            hdr.msg_iov = ctypes.pointer(self.iovs[i])
+            hdr.msg_iovlen = 1
+
+    def recv(self, flags=socket.MSG_DONTWAIT):
+        """Return a list of (memoryview, (ip, port)) for the queued datagrams.
+        The views alias the receive buffers and are overwritten by the next
+        call, so copy anything that must outlive it."""
+        for i in range(self.slots):
+            self.msgs[i].msg_hdr.msg_namelen = 16
+        n = self._libc.recvmmsg(self.fd, self.msgs, self.slots, flags, None)
+        if n < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        out = []
+        for i in range(n):
+            data = memoryview(self.bufs[i])[:self.msgs[i].msg_len]
+            name = self.names[i].raw
+            addr = (socket.inet_ntoa(name[4:8]),
+                    int.from_bytes(name[2:4], "big"))
+            out.append((data, addr))
+        return out
 
 
 # ---------------------------------------------------------------------------
 # AprilTag detection
 # ---------------------------------------------------------------------------
 
-def detect_tags(gray, detector):
-    """Run the ArUco/AprilTag detector, return a list of dicts."""
+@dataclass
+class Detections:
+    """Detected tags as parallel arrays, one row per tag."""
+    ids: np.ndarray       # (N,) int32
+    centers: np.ndarray   # (N, 2) float32
+    corners: np.ndarray   # (N, 4, 2) float32
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, np.int32), np.empty((0, 2), np.float32),
+                   np.empty((0, 4, 2), np.float32))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def index_of(self, tag_ids):
+        """Row index of each requested tag id, or -1 where it is missing."""
+        tag_ids = np.asarray(tag_ids, dtype=np.int32)
+        if len(self.ids) == 0:
+            return np.full(len(tag_ids), -1)
+        order = np.argsort(self.ids)
+        pos = np.minimum(np.searchsorted(self.ids[order], tag_ids),
+                         len(order) - 1)
+        rows = order[pos]
+        return np.where(self.ids[rows] == tag_ids, rows, -1)
+
+
+def detect_tags(gray, detector, scale=1.0, frame_scale=1.0):
+    """Run the ArUco/AprilTag detector, return Detections.
+    With scale < 1 the detector sees a downscaled image. frame_scale is how
+    far `gray` itself is already reduced from the full frame (a scaled JPEG
+    decode). Coordinates are mapped back to full resolution."""
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale,
+                          interpolation=cv2.INTER_AREA)
     corners_list, ids, _ = detector.detectMarkers(gray)
     if ids is None:
-        return []
-    results = []
-    for i, tag_id in enumerate(ids.flatten()):
-        c = corners_list[i][0]
-        results.append({
-            "id": int(tag_id),
-            "center": c.mean(axis=0),
-            "corners": c,
-        })
-    return results
+        return Detections.empty()
+    corners = np.concatenate(corners_list).astype(np.float32)  # (N, 4, 2)
+    back = scale * frame_scale
+    if back != 1.0:
+        corners /= back
+    return Detections(ids.flatten().astype(np.int32),
+                      corners.mean(axis=1), corners)
 
 
 # ---------------------------------------------------------------------------
 # Geometry helpers
 # ---------------------------------------------------------------------------
 
+def _order_quad(pts):
+    """Kernel for order_points on a (4, 2) float32 array."""
+    cx = (pts[0, 0] + pts[1, 0] + pts[2, 0] + pts[3, 0]) / 4.0
+    cy = (pts[0, 1] + pts[1, 1] + pts[2, 1] + pts[3, 1]) / 4.0
+    angles = np.empty(4)
+    for i in range(4):
+        angles[i] = np.arctan2(pts[i, 1] - cy, pts[i, 0] - cx)
+    return pts[np.argsort(angles)]
+
+
+def _square_dst(ordered):
+    """Axis-aligned square with the quad's mean side length, centred on it."""
+    side = 0.0
+    cx = 0.0
+    cy = 0.0
+    for i in range(4):
+        j = (i + 1) % 4
+        dx = ordered[j, 0] - ordered[i, 0]
+        dy = ordered[j, 1] - ordered[i, 1]
+        side += np.sqrt(dx * dx + dy * dy)
+        cx += ordered[i, 0]
+        cy += ordered[i, 1]
+    half = side / 8.0  # mean side / 2
+    cx /= 4.0
+    cy /= 4.0
+    dst = np.empty((4, 2), dtype=np.float32)
+    dst[0, 0] = cx - half
+    dst[0, 1] = cy - half
+    dst[1, 0] = cx + half
+    dst[1, 1] = cy - half
+    dst[2, 0] = cx + half
+    dst[2, 1] = cy + half
+    dst[3, 0] = cx - half
+    dst[3, 1] = cy + half
+    return dst
+
+
+if njit is not None:
+    _order_quad = njit(cache=True)(_order_quad)
+    _square_dst = njit(cache=True)(_square_dst)
+
+
 def order_points(pts):
     """Sort 4 points into top-left, top-right, bottom-right, bottom-left."""
-    pts = np.array(pts, dtype=np.float32)
-    s = pts.sum(axis=1)
-    d = np.diff(pts, axis=1).flatten()
-    return np.array([
-        pts[np.argmin(s)],
-        pts[np.argmin(d)],
-        pts[np.argmax(s)],
-        pts[np.argmax(d)],
-    ], dtype=np.float32)
+    # Clockwise by angle around the centroid (image y points down), which
+    # starts at top-left for any quad rotated less than 45 degrees and is
+    # always a permutation, unlike the four independent argmin/argmax scans
+    return _order_quad(np.ascontiguousarray(pts, dtype=np.float32))
 
 
 # ---------------------------------------------------------------------------
 # Deskew algorithms
 # ---------------------------------------------------------------------------
 
-def deskew_four_tags(image, detections, tag_ids, output_size=None):
+def warp_perspective(image, src, dst, size):
+    """Map the quad `src` onto `dst` in an image of `size` (w, h)."""
+    M = cv2.getPerspectiveTransform(src, dst)
+    return cv2.warpPerspective(image, M, size)
+
+
+class PerspectiveRemapCache:
+    """Drop-in for warp_perspective that keeps the remap tables of the last
+    transform. Points are snapped to 1/2 px so a steadily held camera (sub-
+    pixel detection jitter) reuses them; cv2.remap is ~2x faster than
+    warpPerspective once the maps exist."""
+
+    def __init__(self):
+        self._key = None
+        self._maps = None
+
+    def __call__(self, image, src, dst, size):
+        src = np.round(src * 2.0).astype(np.float32) / 2.0
+        key = (src.tobytes(), dst.tobytes(), size, image.shape)
+        if key != self._key:
+            M = cv2.getPerspectiveTransform(src, dst)
+            # With identity camera matrices and no distortion this builds
+            # exactly the inverse mapping warpPerspective applies for M
+            eye = np.eye(3)
+            self._maps = cv2.initUndistortRectifyMap(
+                eye, None, M, eye, size, cv2.CV_16SC2)
+            self._key = key
+        return cv2.remap(image, self._maps[0], self._maps[1], cv2.INTER_LINEAR)
+
+
+def deskew_four_tags(image, detections, tag_ids, output_size=None,
+                     warp=warp_perspective):
     """Perspective-correct the region bounded by 4 tags."""
-    tag_map = {d["id"]: d for d in detections}
-    missing = [t for t in tag_ids if t not in tag_map]
+    rows = detections.index_of(tag_ids)
+    missing = [t for t, row in zip(tag_ids, rows) if row < 0]
     if missing:
         return None, f"Missing tag(s): {missing}"
 
-    src = np.array([tag_map[t]["center"] for t in tag_ids], dtype=np.float32)
+    src = detections.centers[rows]
 
     if output_size:
         w, h = output_size
     else:
-        w = int(max(np.linalg.norm(src[1] - src[0]),
-                     np.linalg.norm(src[2] - src[3])))
-        h = int(max(np.linalg.norm(src[3] - src[0]),
-                     np.linalg.norm(src[2] - src[1])))
+        # Edge lengths top, right, bottom, left in one vectorised norm
+        edges = np.linalg.norm(np.roll(src, -1, axis=0) - src, axis=1)
+        w = int(max(edges[0], edges[2]))
+        h = int(max(edges[1], edges[3]))
     if w < 10 or h < 10:
         return None, "Detected region too small"
 
     dst = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]],
                    dtype=np.float32)
-    M = cv2.getPerspectiveTransform(src, dst)
-    return cv2.warpPerspective(image, M, (w, h)), None
+    return warp(image, src, dst, (w, h)), None
 
 
-def deskew_single_tag(image, detection):
+def deskew_single_tag(image, corners, warp=warp_perspective):
     """Correct perspective of the full image using one tag's square geometry."""
-    ordered = order_points(detection["corners"])
-    side = np.mean([np.linalg.norm(ordered[(i + 1) % 4] - ordered[i])
-                    for i in range(4)])
-    cx, cy = ordered.mean(axis=0)
-    half = side / 2.0
-    dst = np.array([
-        [cx - half, cy - half],
-        [cx + half, cy - half],
-        [cx + half, cy + half],
-        [cx - half, cy + half],
-    ], dtype=np.float32)
-    M = cv2.getPerspectiveTransform(ordered, dst)
+    ordered = order_points(corners)
+    dst = _square_dst(ordered)
     h, w = image.shape[:2]
-    return cv2.warpPerspective(image, M, (w, h)), None
+    return warp(image, ordered, dst, (w, h)), None
 
 
 # ---------------------------------------------------------------------------
 # Drawing helpers
 # ---------------------------------------------------------------------------
 
-def draw_overlay(image, detections):
-    """Draw detected tag outlines and IDs onto the image."""
-    vis = image.copy()
-    for det in detections:
-        pts = det["corners"].astype(np.int32)
-        cv2.polylines(vis, [pts], True, (0, 255, 0), 3)
-        cx, cy = int(det["center"][0]), int(det["center"][1])
-        cv2.circle(vis, (cx, cy), 5, (0, 0, 255), -1)
-        cv2.putText(vis, str(det["id"]), (cx - 12, cy - 20),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-    return vis
-
-
-def rgb_to_photoimage(rgb_array, max_w, max_h):
-    """Convert an RGB numpy array to a tkinter PhotoImage, fit within bounds."""
+def draw_overlay(image, detections, scale=1.0):
+    """Draw detected tag outlines and IDs onto the image, in place.
+    `scale` maps full-frame detection coordinates onto a resized image."""
+    if not len(detections):
+        return image
+    # All outlines in one polylines call; only the labels need a loop
+    cv2.polylines(image, list((detections.corners * scale).astype(np.int32)),
+                  True, (0, 255, 0), max(1, round(3 * scale)))
+    centers = (detections.centers * scale).astype(np.int32).tolist()
+    for tag_id, (cx, cy) in zip(detections.ids.tolist(), centers):
+        cv2.circle(image, (cx, cy), max(2, round(5 * scale)), (0, 0, 255), -1)
+        cv2.putText(image, str(tag_id),
+                    (cx - round(12 * scale), cy - round(20 * scale)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8 * scale, (0, 255, 0),
+                    max(1, round(2 * scale)))
+    return image
+
+
+def fit_to_bounds(rgb_array, max_w, max_h):
+    """Downscale an RGB numpy array to fit within bounds, as a PIL image.
+    Pure numpy/PIL, so it is safe to call off the Tk thread."""
     h, w = rgb_array.shape[:2]
     scale = min(max_w / w, max_h / h, 1.0)
     new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
@@ -142,8 +371,13 @@ def rgb_to_photoimage(rgb_array, max_w, max_h):
                              interpolation=cv2.INTER_AREA)
     else:
         resized = rgb_array
-    pil_img = Image.fromarray(resized)
-    return ImageTk.PhotoImage(pil_img), new_w, new_h
+    return Image.fromarray(resized)
+
+
+def rgb_to_photoimage(rgb_array, max_w, max_h):
+    """Convert an RGB numpy array to a tkinter PhotoImage, fit within bounds."""
+    pil_img = fit_to_bounds(rgb_array, max_w, max_h)
+    return ImageTk.PhotoImage(pil_img), pil_img.width, pil_img.height
 
 
 # ---------------------------------------------------------------------------
@@ -169,15 +403,32 @@ class ReceiverDeskewApp:
             self.output_size = (int(parts[0]), int(parts[1]))
 
         self.running = True
-        self.last_frame = None        # latest RGB frame from network
-        self.last_detections = []
+        self.last_jpeg = None         # latest detected JPEG from network
+        self.last_frame = None        # its full-res RGB, if already decoded
+        self.last_detections = Detections.empty()
+        self._frame_size = None       # full (w, h), known after a full decode
         self.deskewed_rgb = None
+        self._warp = PerspectiveRemapCache()  # reused across Space presses
         self.save_count = 0
         self.connected = False
+        self.dropped_frames = 0       # torn / non-JPEG payloads skipped
+
+        # Single-slot mailbox: the net thread overwrites the newest JPEG,
+        # the decode thread takes it, so stale frames are never decoded
+        self._latest_jpeg = None
+        self._jpeg_ready = threading.Event()
 
-        # Lock protects last_frame / last_detections written by net thread
+        # Lock protects the mailbox and last_jpeg / last_frame / last_detections
         self._frame_lock = threading.Lock()
 
+        # Latest-wins hand-off of the rendered feed image to the Tk thread:
+        # (PIL image, (frame_w, frame_h), found_ids)
+        self._display_queue = Queue(maxsize=1)
+        self._feed_size = (DISPLAY_W, DISPLAY_H)  # canvas size, set by Tk
+
+        # Self-pipe: quit() writes a byte to wake the network thread at once
+        self._shutdown_r, self._shutdown_w = os.pipe()
+
         self._setup_detector()
         self._build_gui()
         self._start_network_thread()
@@ -198,8 +449,46 @@ class ReceiverDeskewApp:
         params.polygonalApproxAccuracyRate = 0.05  # more lenient corner fitting
         params.minCornerDistanceRate = 0.01
         params.minDistanceToBorder = 1             # detect tags near frame edges
+        # Live preview skips corner refinement; deskew re-detects precisely
+        params.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_NONE
+        self.detector_preview = cv2.aruco.ArucoDetector(dictionary, params)
         params.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_SUBPIX
-        self.detector = cv2.aruco.ArucoDetector(dictionary, params)
+        self.detector_precise = cv2.aruco.ArucoDetector(dictionary, params)
+
+        # libjpeg-turbo decodes straight to RGB; falls back to OpenCV
+        self._tj = None
+        if TurboJPEG is not None:
+            try:
+                self._tj = TurboJPEG()
+            except (OSError, RuntimeError):
+                print("libturbojpeg not found, using OpenCV JPEG decode")
+
+    def _decode_rgb(self, jpeg_data, denom=1):
+        """Decode JPEG bytes to an RGB array at 1/denom size, or None if
+        corrupt."""
+        if self._tj is not None:
+            try:
+                return self._tj.decode(
+                    jpeg_data, pixel_format=TJPF_RGB,
+                    scaling_factor=(1, denom) if denom > 1 else None)
+            except OSError:
+                return None
+        bgr = cv2.imdecode(np.frombuffer(jpeg_data, dtype=np.uint8),
+                           CV_REDUCED_COLOR[denom])
+        return None if bgr is None else cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+    def _preview_denom(self):
+        """Largest JPEG scale denominator that still leaves enough pixels
+        for both the detector and the feed canvas."""
+        if self._frame_size is None:
+            return 1  # first frame: decode fully to learn the size
+        fw, fh = self._frame_size
+        cw, ch = self._feed_size
+        need = max(self.args.detect_scale, min(cw / fw, ch / fh, 1.0))
+        for denom in JPEG_SCALE_DENOMS:
+            if 1.0 / denom >= need:
+                return denom
+        return 1
 
     # -- Network receiver thread --
 
@@ -207,53 +496,145 @@ class ReceiverDeskewApp:
         self._net_thread = threading.Thread(target=self._network_loop,
                                             daemon=True)
         self._net_thread.start()
+        self._decode_thread = threading.Thread(target=self._decode_loop,
+                                               daemon=True)
+        self._decode_thread.start()
 
     def _network_loop(self):
         """Runs in a background thread: receives UDP datagrams with JPEG frames."""
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        set_receive_buffer(sock)
         sock.bind(("0.0.0.0", self.args.port))
         print(f"Listening on UDP port {self.args.port} ...")
 
+        # Drain everything queued in one syscall where recvmmsg exists;
+        # otherwise fall back to one recvfrom per datagram
+        mmsg = MmsgReceiver(sock, RECV_BATCH) if MmsgReceiver.available() else None
+        rxbuf = bytearray(MAX_UDP_RECV)  # reused by the fallback path
+        rxview = memoryview(rxbuf)
+        sock.setblocking(False)
+
+        # Block until data arrives or quit() writes to the shutdown pipe
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+        sel.register(self._shutdown_r, selectors.EVENT_READ)
+
         while self.running:
-            sock.settimeout(1.0)
-            try:
-                data, addr = sock.recvfrom(MAX_UDP_RECV)
-            except socket.timeout:
+            events = sel.select()
+            if not self.running:
+                break
+            if not any(key.fileobj is sock for key, _ in events):
                 continue
-            except OSError:
+            try:
+                if mmsg is not None:
+                    datagrams = mmsg.recv()
+                else:
+                    nbytes, addr = sock.recvfrom_into(rxbuf)
+                    datagrams = [(rxview[:nbytes], addr)]
+            except OSError:  # includes BlockingIOError on a spurious wakeup
                 continue
 
-            if not self.connected:
-                print(f"Receiving from {addr}")
+            if not self.connected and datagrams:
+                print(f"Receiving from {datagrams[0][1]}")
                 self.connected = True
 
-            # Need at least 4-byte header
-            if len(data) < 4:
+            # Only the newest complete frame in the batch matters
+            jpeg_data = None
+            for data, _ in reversed(datagrams):
+                # Need at least 4-byte header
+                if len(data) < 4:
+                    continue
+                frame_len = FRAME_HEADER.unpack_from(data)[0]
+                if len(data) - 4 != frame_len:
+                    continue  # truncated datagram
+                tail = bytes(data[max(6, len(data) - EOI_SEARCH_BYTES):])
+                if data[4:6] != JPEG_SOI or JPEG_EOI not in tail:
+                    self.dropped_frames += 1  # torn JPEG, not worth decoding
+                    continue
+                jpeg_data = bytes(data[4:])  # copy out of the receive buffer
+                break
+            if jpeg_data is None:
                 continue
-            frame_len = struct.unpack(">I", data[:4])[0]
-            jpeg_data = data[4:]
-            if len(jpeg_data) != frame_len:
-                continue  # truncated datagram
-
-            # Decode JPEG → BGR, then convert to RGB for tkinter
-            bgr = cv2.imdecode(
-                np.frombuffer(jpeg_data, dtype=np.uint8),
-                cv2.IMREAD_COLOR)
-            if bgr is None:
-                continue
-            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-
-            # Detect tags (on grayscale)
-            gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
-            detections = detect_tags(gray, self.detector)
 
+            # Latest wins: an undecoded older frame is simply replaced
             with self._frame_lock:
-                self.last_frame = rgb
-                self.last_detections = detections
+                self._latest_jpeg = jpeg_data
+            self._jpeg_ready.set()
 
+        sel.close()
         sock.close()
+        os.close(self._shutdown_r)
+
+    def _decode_loop(self):
+        """Background thread: decode, detect and render the newest frame, at
+        most once per GUI refresh, regardless of the incoming packet rate."""
+        interval = FEED_INTERVAL_MS / 1000.0
+        while self.running:
+            if not self._jpeg_ready.wait(timeout=1.0):
+                continue
+            start = time.monotonic()
+            with self._frame_lock:
+                jpeg_data = self._latest_jpeg
+                self._latest_jpeg = None
+                self._jpeg_ready.clear()
+            if jpeg_data is None:
+                continue
+
+            # One reduced-size RGB decode serves display and detection;
+            # deskew / save decode the full frame only when asked
+            denom = self._preview_denom()
+            rgb = self._decode_rgb(jpeg_data, denom)
+            if rgb is not None:
+                h, w = rgb.shape[:2]
+                if denom == 1:
+                    self._frame_size = (w, h)
+                elif (-(-self._frame_size[0] // denom),
+                      -(-self._frame_size[1] // denom)) != (w, h):
+                    # Stream resolution changed: relearn it next frame
+                    self._frame_size = None
+                    continue
+                gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+                detections = detect_tags(gray, self.detector_preview,
+                                         min(self.args.detect_scale * denom, 1.0),
+                                         frame_scale=1.0 / denom)
+
+                with self._frame_lock:
+                    self.last_jpeg = jpeg_data
+                    self.last_frame = rgb if denom == 1 else None
+                    self.last_detections = detections
+
+                self._publish_feed(rgb, detections, self._frame_size)
+
+            # Frames arriving meanwhile collapse into the mailbox
+            remaining = interval - (time.monotonic() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _publish_feed(self, rgb, detections, frame_size):
+        """Render the overlay at canvas size and hand it to the Tk thread,
+        replacing any image it has not shown yet. `rgb` may be a reduced
+        decode of a frame_size (w, h) frame; detections are full-res."""
+        cw, ch = self._feed_size
+        fw, fh = frame_size
+        # Resize first so the overlay is drawn on the small image only
+        scale = min(cw / fw, ch / fh, 1.0)
+        out_size = (max(1, int(fw * scale)), max(1, int(fh * scale)))
+        if out_size != (rgb.shape[1], rgb.shape[0]):
+            vis = cv2.resize(rgb, out_size, interpolation=cv2.INTER_AREA)
+        else:
+            vis = rgb.copy()  # last_frame is shared with deskew / save
+        draw_overlay(vis, detections, scale)
+        item = (Image.fromarray(vis), (fw, fh),
+                sorted(detections.ids.tolist()))
+        try:
+            self._display_queue.put_nowait(item)
+        except Full:
+            try:
+                self._display_queue.get_nowait()
+            except Empty:
+                pass
+            self._display_queue.put_nowait(item)
 
     # -- GUI layout (mirrors apriltag_deskew.py) --
 
@@ -285,6 +666,8 @@ class ReceiverDeskewApp:
                                      bg="#181825", highlightthickness=0)
         self.feed_canvas.pack(fill="both", expand=True)
         self._feed_photo = None
+        self._feed_img_id = self.feed_canvas.create_image(
+            DISPLAY_W // 2, DISPLAY_H // 2)
 
         # Right panel: deskewed result
         right = ttk.Frame(panels)
@@ -356,22 +739,41 @@ class ReceiverDeskewApp:
 
     # -- Feed update loop (runs on tkinter main thread) --
 
+    def _latest_frame(self):
+        """Return (full-res rgb, detections) for the newest detected frame,
+        decoding it here if the preview only needed a reduced decode."""
+        with self._frame_lock:
+            jpeg_data = self.last_jpeg
+            frame = self.last_frame
+            detections = self.last_detections  # replaced, never mutated
+        if frame is None and jpeg_data is not None:
+            frame = self._decode_rgb(jpeg_data)
+            with self._frame_lock:
+                if self.last_jpeg is jpeg_data:
+                    self.last_frame = frame  # reuse on the next button press
+        return frame, detections
+
     def _update_feed(self):
         if not self.running:
             return
 
-        with self._frame_lock:
-            frame = self.last_frame
-            detections = list(self.last_detections)
+        # Tell the decode thread what size to render at
+        cw = self.feed_canvas.winfo_width()
+        ch = self.feed_canvas.winfo_height()
+        if cw < 2 or ch < 2:
+            cw, ch = DISPLAY_W, DISPLAY_H
+        self._feed_size = (cw, ch)
 
-        if frame is not None:
-            # Draw overlay on a copy
-            vis = draw_overlay(frame, detections)
+        try:
+            pil_img, (fw, fh), found_ids = self._display_queue.get_nowait()
+        except Empty:
+            pil_img = None
 
+        if pil_img is not None:
             # Update status
-            fh, fw = frame.shape[:2]
             res_str = f"[{fw}x{fh}]"
-            found_ids = sorted([d["id"] for d in detections])
+            if self.dropped_frames:
+                res_str += f"  Dropped: {self.dropped_frames}"
             ready = all(t in found_ids for t in self.needed_ids)
             if ready:
                 self.status_var.set(
@@ -384,45 +786,49 @@ class ReceiverDeskewApp:
                     f"{res_str}  Tags: {found_ids}  --  Missing: {missing}")
                 self.status_label.configure(style="Warn.TLabel")
 
-            # Render to left canvas
-            cw = self.feed_canvas.winfo_width()
-            ch = self.feed_canvas.winfo_height()
-            if cw < 2 or ch < 2:
-                cw, ch = DISPLAY_W, DISPLAY_H
-            photo, pw, ph = rgb_to_photoimage(vis, cw, ch)
-            self._feed_photo = photo  # prevent GC
-            self.feed_canvas.delete("all")
-            self.feed_canvas.create_image(cw // 2, ch // 2, image=photo)
+            # Render to left canvas: paste into the existing PhotoImage and
+            # only allocate a new one when the rendered size changes
+            photo = self._feed_photo
+            if photo is None or (photo.width(), photo.height()) != pil_img.size:
+                photo = ImageTk.PhotoImage(pil_img)
+                self._feed_photo = photo  # prevent GC
+                self.feed_canvas.itemconfig(self._feed_img_id, image=photo)
+            else:
+                photo.paste(pil_img)
+            self.feed_canvas.coords(self._feed_img_id, cw // 2, ch // 2)
 
         elif not self.connected:
             self.status_var.set(
                 f"Waiting for camera on port {self.args.port} ...")
             self.status_label.configure(style="Warn.TLabel")
 
-        self.root.after(50, self._update_feed)  # ~20 fps
+        self.root.after(FEED_INTERVAL_MS, self._update_feed)  # ~20 fps
 
     # -- Actions --
 
     def do_deskew(self):
-        with self._frame_lock:
-            frame = self.last_frame
-            detections = list(self.last_detections)
+        frame, _ = self._latest_frame()
 
         if frame is None:
             return
 
+        # Sub-pixel corners for the homography; the preview's are coarse
+        detections = detect_tags(cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY),
+                                 self.detector_precise)
+
         if self.single_tag_id is not None:
-            det = next((d for d in detections
-                        if d["id"] == self.single_tag_id), None)
-            if det is None:
+            row = detections.index_of([self.single_tag_id])[0]
+            if row < 0:
                 self.status_var.set(
                     f"Cannot deskew: tag {self.single_tag_id} not found")
                 self.status_label.configure(style="Warn.TLabel")
                 return
-            result, err = deskew_single_tag(frame, det)
+            result, err = deskew_single_tag(frame, detections.corners[row],
+                                            warp=self._warp)
         else:
             result, err = deskew_four_tags(
-                frame, detections, self.tag_ids, self.output_size)
+                frame, detections, self.tag_ids, self.output_size,
+                warp=self._warp)
 
         if err:
             self.status_var.set(f"Deskew failed: {err}")
@@ -460,8 +866,7 @@ class ReceiverDeskewApp:
         self.status_label.configure(style="Status.TLabel")
 
     def save_raw(self):
-        with self._frame_lock:
-            frame = self.last_frame
+        frame, _ = self._latest_frame()
 
         if frame is None:
             return
@@ -473,6 +878,13 @@ class ReceiverDeskewApp:
 
     def quit(self):
         self.running = False
+        # Wake both worker threads instead of waiting for a timeout
+        try:
+            os.write(self._shutdown_w, b"\0")
+        except OSError:
+            pass
+        os.close(self._shutdown_w)
+        self._jpeg_ready.set()
         self.root.destroy()
 
 
@@ -496,7 +908,13 @@ def main():
                     help="Tag family (default: DICT_APRILTAG_36h11)")
     ap.add_argument("--output-size", default=None, metavar="WxH",
                     help="Force output size, e.g. 1920x1080")
+    ap.add_argument("--detect-scale", type=float, default=0.5, metavar="S",
+                    help="Downscale factor for live-preview detection; deskew "
+                         "always detects at full resolution (default 0.5, "
+                         "use 1.0 for very small tags)")
     args = ap.parse_args()
+    if not 0.0 < args.detect_scale <= 1.0:
+        ap.error("--detect-scale must be in (0, 1]")
 
     tag_ids = [int(x) for x in args.tags.split(",")]
     if len(tag_ids) != 4 and args.single_tag is None:
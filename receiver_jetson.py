@@ -12,19 +12,26 @@ Usage:
 """
 
 import argparse
+import functools
 import glob as globmod
 import os
+import selectors
 import socket
 import struct
 import threading
 import time
 import tkinter as tk
+from collections import deque
 from datetime import datetime
 from tkinter import ttk
 
 import cv2
 import numpy as np
-from PIL import Image, ImageTk
+
+try:
+    from turbojpeg import TJPF_RGB, TurboJPEG
+except ImportError:
+    TurboJPEG = None
 
 # ---------------------------------------------------------------------------
 # DS18B20 temperature sensor helpers
@@ -71,26 +78,206 @@ DISPLAY_W = 380
 DISPLAY_H = 200
 
 MAX_UDP_RECV = 65535
+FRAME_HEADER = struct.Struct(">I")  # 4-byte big-endian length prefix
+FRAG_HEADER = struct.Struct(">IHH")  # Jetson return: frame_id, frag_idx, frag_count
+MAX_FRAGMENT_RECV = 2048   # Jetson return fragments are <= 1400 B of payload
+REASSEMBLY_FRAMES = 4      # partial frames kept while waiting for fragments
+# --raw-return: each reassembled frame is RAW_HEADER (rgb_len, width, height)
+# + packed RGB already at display size, so the Pi has nothing to decode
+RAW_HEADER = struct.Struct(">IHH")
 
 VLM_LOG_LINES = 8
 
+# Socket buffers; Linux clips SO_RCVBUF / SO_SNDBUF to net.core.{r,w}mem_max
+SOCK_BUF_BYTES = 12 * 1024 * 1024
+SO_SNDBUFFORCE = getattr(socket, "SO_SNDBUFFORCE", 32)  # Linux, need CAP_NET_ADMIN
+SO_RCVBUFFORCE = getattr(socket, "SO_RCVBUFFORCE", 33)
+
+PPM_HEADER = b"P6 %d %d 255\n"  # binary RGB, fed to Tk via PhotoImage(data=)
+
+# libjpeg can decode at 1/2, 1/4 or 1/8 size in the IDCT, far cheaper than
+# a full decode plus resize; OpenCV exposes the same through IMREAD_REDUCED_*
+JPEG_SCALE_DENOMS = (8, 4, 2)
+CV_REDUCED_COLOR = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                    4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+# ---------------------------------------------------------------------------
+# Socket helpers
+# ---------------------------------------------------------------------------
+
+def set_socket_buffer(sock, option, size=SOCK_BUF_BYTES):
+    """Ask for a large SO_RCVBUF / SO_SNDBUF, bypassing the sysctl cap when
+    privileged. Returns the effective size and warns if it was clipped."""
+    if option == socket.SO_RCVBUF:
+        force, kind, sysctl = SO_RCVBUFFORCE, "receive", "rmem_max"
+    else:
+        force, kind, sysctl = SO_SNDBUFFORCE, "send", "wmem_max"
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, force, size)
+    except OSError:
+        sock.setsockopt(socket.SOL_SOCKET, option, size)
+    # Linux reports double the requested value (bookkeeping overhead)
+    actual = sock.getsockopt(socket.SOL_SOCKET, option) // 2
+    if actual < size:
+        print(f"WARNING: UDP {kind} buffer is {actual // 1024} KiB, "
+              f"wanted {size // 1024} KiB; frames may drop under load.\n"
+              f"  Raise the limit with: sudo sysctl -w net.core.{sysctl}={size}")
+    return actual
+
+
+# ---------------------------------------------------------------------------
+# Jetson return-frame reassembly
+# ---------------------------------------------------------------------------
+
+class FrameReassembler:
+    """Rebuilds processed JPEG frames from the Jetson's fragments.
+    Each datagram is FRAG_HEADER (frame_id, frag_idx, frag_count) + payload.
+    At most REASSEMBLY_FRAMES partial frames are kept; when a frame
+    completes, any older partial frames are dropped as stale."""
+
+    def __init__(self):
+        self._pending = {}  # frame_id -> [remaining, parts], insertion-ordered
+
+    def add(self, data):
+        """Add one fragment; return the completed JPEG bytes or None."""
+        if len(data) <= FRAG_HEADER.size:
+            return None
+        frame_id, idx, count = FRAG_HEADER.unpack_from(data)
+        if idx >= count:
+            return None
+
+        entry = self._pending.get(frame_id)
+        if entry is None:
+            if len(self._pending) >= REASSEMBLY_FRAMES:
+                del self._pending[next(iter(self._pending))]
+            entry = self._pending[frame_id] = [count, [None] * count]
+        parts = entry[1]
+        if len(parts) != count or parts[idx] is not None:
+            return None
+        parts[idx] = bytes(data[FRAG_HEADER.size:])  # data may alias a recv buffer
+        entry[0] -= 1
+        if entry[0]:
+            return None
+
+        for stale_id in list(self._pending):
+            del self._pending[stale_id]
+            if stale_id == frame_id:
+                break
+        return b"".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Per-stream frame hand-off
+# ---------------------------------------------------------------------------
+
+class StreamSlot:
+    """Latest-wins hand-off of one stream's JPEGs from its receive thread
+    to its decode thread, and of decoded frames to the display tick."""
+
+    def __init__(self):
+        self.lock = threading.Lock()       # guards jpeg and pending
+        self.jpeg = None        # newest raw JPEG, decoded or not (for saving)
+        self.pending = None     # newest JPEG the decode thread has not taken
+        # (rgb, (w, h)): last decoded frame at display scale plus the full
+        # stream size. Replaced whole, never mutated, so a single attribute
+        # load under the GIL reads it without a lock
+        self.latest = None
+        self.seq = 0            # bumped after each publish of latest
+        self.ready = threading.Event()         # pending holds a JPEG
+        self.needs_decode = threading.Event()  # set by each display tick
+        self.needs_decode.set()
+        # Two RGB buffers used in turn, so a decode never overwrites the
+        # frame the display tick may still be rendering
+        self.rgb_bufs = [None, None]
+        self.next_buf = 0
+
+    def put_jpeg(self, jpeg_data):
+        """Publish a received JPEG, replacing any not yet decoded."""
+        with self.lock:
+            self.jpeg = jpeg_data
+            self.pending = jpeg_data
+        self.ready.set()
+
+    def put_frame(self, rgb, size):
+        """Publish an already-decoded frame (raw return stream)."""
+        self.latest = (rgb, size)
+        self.seq += 1
+
+    def take_pending(self):
+        with self.lock:
+            jpeg_data, self.pending = self.pending, None
+            self.ready.clear()
+        return jpeg_data
+
+
+def parse_raw_frame(payload):
+    """Return (rgb, (w, h)) from a --raw-return frame, or None if malformed."""
+    if len(payload) < RAW_HEADER.size:
+        return None
+    rgb_len, w, h = RAW_HEADER.unpack_from(payload)
+    if rgb_len != w * h * 3 or len(payload) - RAW_HEADER.size != rgb_len:
+        return None
+    rgb = np.frombuffer(payload, np.uint8, rgb_len, RAW_HEADER.size)
+    return rgb.reshape(h, w, 3), (w, h)
+
 
 # ---------------------------------------------------------------------------
 # Display helpers
 # ---------------------------------------------------------------------------
 
+def jpeg_size(jpeg_data):
+    """Return (width, height) from a JPEG's SOF header, or None."""
+    i, n = 2, len(jpeg_data)
+    while i + 9 <= n:
+        if jpeg_data[i] != 0xFF:
+            return None
+        marker = jpeg_data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        # SOF0..SOF15, excluding DHT / JPG / DAC which share the range
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack_from(">HH", jpeg_data, i + 5)
+            return w, h
+        i += 2 + int.from_bytes(jpeg_data[i + 2:i + 4], "big")
+    return None
+
+
+def scale_denom(src_w, src_h, max_w, max_h):
+    """Largest JPEG decode denominator that still fills max_w x max_h."""
+    need = min(max_w / src_w, max_h / src_h, 1.0)
+    for denom in JPEG_SCALE_DENOMS:
+        if 1.0 / denom >= need:
+            return denom
+    return 1
+
+
+@functools.lru_cache(maxsize=16)
+def _plan(src_w, src_h, max_w, max_h):
+    """Target size for fitting (src_w, src_h) in bounds; None if no resize.
+    Panel and frame sizes rarely change, so this is a cache hit per tick."""
+    scale = min(max_w / src_w, max_h / src_h, 1.0)
+    if scale >= 1.0:
+        return None
+    return max(1, int(src_w * scale)), max(1, int(src_h * scale))
+
+
 def rgb_to_photoimage(rgb_array, max_w, max_h):
-    """Convert an RGB numpy array to a tkinter PhotoImage, fit within bounds."""
+    """Convert an RGB numpy array to a tkinter PhotoImage, fit within bounds.
+    The pixels go to Tk as an in-memory binary PPM, with no PIL round-trip."""
     h, w = rgb_array.shape[:2]
-    scale = min(max_w / w, max_h / h, 1.0)
-    new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
-    if scale < 1.0:
-        resized = cv2.resize(rgb_array, (new_w, new_h),
-                             interpolation=cv2.INTER_AREA)
-    else:
+    plan = _plan(w, h, max_w, max_h)
+    if plan is None:
+        new_w, new_h = w, h
         resized = rgb_array
-    pil_img = Image.fromarray(resized)
-    return ImageTk.PhotoImage(pil_img), new_w, new_h
+    else:
+        # Display-only panel: nearest-neighbour is plenty and far cheaper
+        new_w, new_h = plan
+        resized = cv2.resize(rgb_array, plan, interpolation=cv2.INTER_NEAREST)
+    ppm = PPM_HEADER % (new_w, new_h) + np.ascontiguousarray(resized).tobytes()
+    return tk.PhotoImage(width=new_w, height=new_h, data=ppm,
+                         format="PPM"), new_w, new_h
 
 
 # ---------------------------------------------------------------------------
@@ -107,10 +294,14 @@ class ReceiverJetsonApp:
         self.root.protocol("WM_DELETE_WINDOW", self.quit)
 
         self.running = True
-        self._camera_frame = None
-        self._jetson_frame = None
-        self._camera_lock = threading.Lock()
-        self._jetson_lock = threading.Lock()
+        self._camera = StreamSlot()
+        self._jetson = StreamSlot()
+        # Canvas sizes, refreshed by the display tick, pick the decode scale
+        self._feed_size = (DISPLAY_W, DISPLAY_H)
+        self._result_size = (DISPLAY_W, DISPLAY_H)
+        # StreamSlot.seq of the frame each panel last rendered
+        self._camera_shown_seq = 0
+        self._jetson_shown_seq = 0
         self._camera_connected = False
         self._jetson_connected = False
 
@@ -123,10 +314,11 @@ class ReceiverJetsonApp:
         self._jetson_fps_time = time.monotonic()
 
         # VLM message state
-        self._vlm_messages = []
         self._vlm_lock = threading.Lock()
         self._vlm_max_messages = 50
-        self._vlm_rendered_count = 0
+        self._vlm_messages = deque(maxlen=self._vlm_max_messages)
+        self._vlm_total_seen = 0      # absolute count of messages received
+        self._vlm_rendered_count = 0  # absolute count already in the widget
 
         # DS18B20 temperature state
         self._temp_c = None
@@ -138,130 +330,197 @@ class ReceiverJetsonApp:
             print("DS18B20 sensor not found — temperature display disabled")
 
 
+        # libjpeg-turbo decodes straight to RGB; falls back to OpenCV
+        self._tj = None
+        if TurboJPEG is not None:
+            try:
+                self._tj = TurboJPEG()
+            except (OSError, RuntimeError):
+                print("libturbojpeg not found, using OpenCV JPEG decode")
+
         # Socket for forwarding to Jetson (created once, used by camera thread)
         self._fwd_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self._fwd_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
-                                  4 * 1024 * 1024)
+        set_socket_buffer(self._fwd_sock, socket.SO_SNDBUF)
+        # Fixed destination: connect once so send() skips the per-packet
+        # address resolution and route lookup of sendto()
+        try:
+            self._fwd_sock.connect((args.jetson_host, args.jetson_port))
+        except OSError as e:
+            print(f"Cannot reach Jetson at {args.jetson_host}:"
+                  f"{args.jetson_port} ({e}) — frames will not be forwarded")
 
         self._build_gui()
         self._start_network_threads()
         self._update_display()
 
+    def _decode_rgb(self, jpeg_data, denom=1, out=None):
+        """Decode JPEG bytes to an RGB array at 1/denom size, or None if
+        corrupt. On the OpenCV path the BGR->RGB swap writes into `out`
+        when it has the right shape."""
+        if self._tj is not None:
+            try:
+                return self._tj.decode(
+                    jpeg_data, pixel_format=TJPF_RGB,
+                    scaling_factor=(1, denom) if denom > 1 else None)
+            except OSError:
+                return None
+        bgr = cv2.imdecode(np.frombuffer(jpeg_data, dtype=np.uint8),
+                           CV_REDUCED_COLOR[denom])
+        if bgr is None:
+            return None
+        if out is not None and out.shape == bgr.shape:
+            return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=out)
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+    def _decode_for_display(self, jpeg_data, canvas_size, out=None):
+        """Decode at the smallest DCT scale that still fills the canvas.
+        Returns (rgb, full (w, h)), or (None, None) if corrupt."""
+        size = jpeg_size(jpeg_data)
+        denom = 1 if size is None else scale_denom(*size, *canvas_size)
+        rgb = self._decode_rgb(jpeg_data, denom, out)
+        if rgb is None:
+            return None, None
+        return rgb, size or (rgb.shape[1], rgb.shape[0])
+
     # -- Network threads --
 
     def _start_network_threads(self):
-        threading.Thread(target=self._camera_recv_loop, daemon=True).start()
-        threading.Thread(target=self._jetson_recv_loop, daemon=True).start()
-        threading.Thread(target=self._vlm_recv_loop, daemon=True).start()
+        threading.Thread(target=self._io_loop, daemon=True).start()
+        threading.Thread(target=self._decode_loop, daemon=True,
+                         args=(self._camera, lambda: self._feed_size)).start()
+        threading.Thread(target=self._decode_loop, daemon=True,
+                         args=(self._jetson, lambda: self._result_size)).start()
         if self._sensor_path:
             threading.Thread(target=self._temp_poll_loop, daemon=True).start()
 
-    def _camera_recv_loop(self):
-        """Receive camera frames on --port, decode for display, forward to Jetson."""
+    def _open_udp(self, port, what, large_buffer=True):
+        """Bind a non-blocking UDP socket for the I/O thread."""
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
-        sock.bind(("0.0.0.0", self.args.port))
-        print(f"Listening for camera on UDP port {self.args.port} ...")
+        if large_buffer:
+            set_socket_buffer(sock, socket.SO_RCVBUF)
+        sock.bind(("0.0.0.0", port))
+        sock.setblocking(False)
+        print(f"Listening for {what} on UDP port {port} ...")
+        return sock
+
+    def _io_loop(self):
+        """Single I/O thread: multiplex the camera, Jetson-return and VLM
+        sockets with one selector instead of a blocked thread per socket."""
+        cam_sock = self._open_udp(self.args.port, "camera")
+        jet_sock = self._open_udp(self.args.return_port, "Jetson return")
+        vlm_sock = self._open_udp(self.args.vlm_port, "VLM analysis",
+                                  large_buffer=False)
+
+        # One receive buffer per socket for the life of the thread
+        sel = selectors.DefaultSelector()
+        sel.register(cam_sock, selectors.EVENT_READ,
+                     (self._on_camera_datagram, bytearray(MAX_UDP_RECV)))
+        sel.register(jet_sock, selectors.EVENT_READ,
+                     (self._on_jetson_datagram, bytearray(MAX_FRAGMENT_RECV)))
+        sel.register(vlm_sock, selectors.EVENT_READ,
+                     (self._on_vlm_datagram, bytearray(MAX_UDP_RECV)))
+        self._reassembler = FrameReassembler()
 
         while self.running:
-            sock.settimeout(1.0)
-            try:
-                data, addr = sock.recvfrom(MAX_UDP_RECV)
-            except socket.timeout:
-                continue
-            except OSError:
-                continue
-
-            if not self._camera_connected:
-                print(f"Camera receiving from {addr}")
-                self._camera_connected = True
-
-            # Validate
-            if len(data) < 4:
-                continue
-            frame_len = struct.unpack(">I", data[:4])[0]
-            jpeg_data = data[4:]
-            if len(jpeg_data) != frame_len:
-                continue
-
-            # Decode for display
-            bgr = cv2.imdecode(
-                np.frombuffer(jpeg_data, dtype=np.uint8), cv2.IMREAD_COLOR)
-            if bgr is None:
-                continue
-            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-
-            with self._camera_lock:
-                self._camera_frame = rgb
-
-            # Update camera FPS
-            self._camera_frame_count += 1
-            now = time.monotonic()
-            elapsed = now - self._camera_fps_time
-            if elapsed >= 1.0:
-                self._camera_fps = self._camera_frame_count / elapsed
-                self._camera_frame_count = 0
-                self._camera_fps_time = now
-
-            # Forward raw datagram to Jetson
-            try:
-                self._fwd_sock.sendto(
-                    data, (self.args.jetson_host, self.args.jetson_port))
-            except OSError:
-                pass
+            for key, _ in sel.select(timeout=1.0):
+                handler, buf = key.data
+                try:
+                    nbytes, addr = key.fileobj.recvfrom_into(buf)
+                except OSError:  # includes BlockingIOError
+                    continue
+                handler(memoryview(buf)[:nbytes], addr)
+
+        sel.close()
+        for sock in (cam_sock, jet_sock, vlm_sock):
+            sock.close()
+
+    def _on_camera_datagram(self, data, addr):
+        """Camera frame: forward to Jetson, hand the JPEG to its decode thread."""
+        if not self._camera_connected:
+            print(f"Camera receiving from {addr}")
+            self._camera_connected = True
 
-        sock.close()
+        # Validate
+        if len(data) < 4:
+            return
+        frame_len = FRAME_HEADER.unpack_from(data)[0]
+        if len(data) - 4 != frame_len:
+            return
 
-    def _jetson_recv_loop(self):
-        """Receive processed frames back from Jetson on --return-port."""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
-        sock.bind(("0.0.0.0", self.args.return_port))
-        print(f"Listening for Jetson return on UDP port {self.args.return_port} ...")
+        # Forward raw datagram to Jetson before any local work
+        try:
+            self._fwd_sock.send(data)
+        except OSError:
+            pass
+
+        # The only copy: the newest JPEG must outlive the buffer
+        jpeg_data = bytes(data[4:])
+
+        # Update camera FPS (every received frame counts)
+        self._camera_frame_count += 1
+        now = time.monotonic()
+        elapsed = now - self._camera_fps_time
+        if elapsed >= 1.0:
+            self._camera_fps = self._camera_frame_count / elapsed
+            self._camera_frame_count = 0
+            self._camera_fps_time = now
+
+        self._camera.put_jpeg(jpeg_data)
+
+    def _on_jetson_datagram(self, data, addr):
+        """Processed-frame fragment back from the Jetson on --return-port."""
+        if not self._jetson_connected:
+            print(f"Jetson receiving from {addr}")
+            self._jetson_connected = True
+
+        # Reassemble; only a complete frame is decoded
+        payload = self._reassembler.add(data)
+        if payload is None:
+            return
+        if self.args.raw_return:
+            raw = parse_raw_frame(payload)
+            if raw is None:
+                return
+
+        # Update Jetson FPS (every completed frame counts)
+        self._jetson_frame_count += 1
+        now = time.monotonic()
+        elapsed = now - self._jetson_fps_time
+        if elapsed >= 1.0:
+            self._jetson_fps = self._jetson_frame_count / elapsed
+            self._jetson_frame_count = 0
+            self._jetson_fps_time = now
+
+        if self.args.raw_return:
+            self._jetson.put_frame(*raw)
+        else:
+            self._jetson.put_jpeg(payload)
 
+    def _decode_loop(self, slot, canvas_size):
+        """Decode thread for one stream: once per display tick, decode the
+        newest JPEG so slow decodes never hold up socket draining."""
         while self.running:
-            sock.settimeout(1.0)
-            try:
-                data, addr = sock.recvfrom(MAX_UDP_RECV)
-            except socket.timeout:
-                continue
-            except OSError:
+            # Wait for the display to want a frame, then for a frame
+            if not slot.needs_decode.wait(timeout=1.0):
                 continue
-
-            if not self._jetson_connected:
-                print(f"Jetson receiving from {addr}")
-                self._jetson_connected = True
-
-            # Validate
-            if len(data) < 4:
+            if not slot.ready.wait(timeout=1.0):
                 continue
-            frame_len = struct.unpack(">I", data[:4])[0]
-            jpeg_data = data[4:]
-            if len(jpeg_data) != frame_len:
+            jpeg_data = slot.take_pending()
+            if jpeg_data is None:
                 continue
 
-            # Decode for display
-            bgr = cv2.imdecode(
-                np.frombuffer(jpeg_data, dtype=np.uint8), cv2.IMREAD_COLOR)
-            if bgr is None:
+            i = slot.next_buf
+            rgb, size = self._decode_for_display(jpeg_data, canvas_size(),
+                                                 slot.rgb_bufs[i])
+            if rgb is None:
                 continue
-            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-
-            with self._jetson_lock:
-                self._jetson_frame = rgb
-
-            # Update Jetson FPS
-            self._jetson_frame_count += 1
-            now = time.monotonic()
-            elapsed = now - self._jetson_fps_time
-            if elapsed >= 1.0:
-                self._jetson_fps = self._jetson_frame_count / elapsed
-                self._jetson_frame_count = 0
-                self._jetson_fps_time = now
-
-        sock.close()
+            # A fresh array (first frame or new shape) becomes the buffer
+            slot.rgb_bufs[i] = rgb
+            slot.next_buf = 1 - i
+            slot.latest = (rgb, size)
+            slot.seq += 1
+            slot.needs_decode.clear()
 
     def _temp_poll_loop(self):
         """Poll the DS18B20 sensor every second and store the latest reading."""
@@ -271,41 +530,22 @@ class ReceiverJetsonApp:
                 self._temp_c = temp
             time.sleep(1)
 
-    def _vlm_recv_loop(self):
-        """Receive VLM analysis text from Jetson on --vlm-port."""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.bind(("0.0.0.0", self.args.vlm_port))
-        print(f"Listening for VLM analysis on UDP port {self.args.vlm_port} ...")
-
-        while self.running:
-            sock.settimeout(1.0)
-            try:
-                data, addr = sock.recvfrom(MAX_UDP_RECV)
-            except socket.timeout:
-                continue
-            except OSError:
-                continue
-
-            try:
-                msg = data.decode("utf-8")
-            except UnicodeDecodeError:
-                continue
-
-            # Attach the most recent temperature reading to the log entry
-            with self._temp_lock:
-                temp = self._temp_c
-            if temp is not None:
-                msg = f"{msg}  [Temp: {temp:.1f}°C / {temp * 9 / 5 + 32:.1f}°F]"
+    def _on_vlm_datagram(self, data, addr):
+        """VLM analysis text from the Jetson on --vlm-port."""
+        try:
+            msg = str(data, "utf-8")
+        except UnicodeDecodeError:
+            return
 
-            with self._vlm_lock:
-                self._vlm_messages.append(msg)
-                if len(self._vlm_messages) > self._vlm_max_messages:
-                    self._vlm_messages = self._vlm_messages[-self._vlm_max_messages:]
-                    self._vlm_rendered_count = min(
-                        self._vlm_rendered_count, len(self._vlm_messages))
+        # Attach the most recent temperature reading to the log entry
+        with self._temp_lock:
+            temp = self._temp_c
+        if temp is not None:
+            msg = f"{msg}  [Temp: {temp:.1f}°C / {temp * 9 / 5 + 32:.1f}°F]"
 
-        sock.close()
+        with self._vlm_lock:
+            self._vlm_messages.append(msg)
+            self._vlm_total_seen += 1
 
     # -- GUI layout --
 
@@ -337,6 +577,9 @@ class ReceiverJetsonApp:
                                      bg="#181825", highlightthickness=0)
         self.feed_canvas.pack(fill="both", expand=True)
         self._feed_photo = None
+        # One persistent image item; each tick only retargets its image
+        self._feed_item = self.feed_canvas.create_image(
+            DISPLAY_W // 2, DISPLAY_H // 2)
 
         # Right panel: Jetson processed
         right = ttk.Frame(panels)
@@ -347,6 +590,8 @@ class ReceiverJetsonApp:
                                        bg="#181825", highlightthickness=0)
         self.result_canvas.pack(fill="both", expand=True)
         self._result_photo = None
+        self._result_item = self.result_canvas.create_image(
+            DISPLAY_W // 2, DISPLAY_H // 2)
 
         # -- VLM Analysis Log --
         vlm_frame = ttk.Frame(self.root)
@@ -406,10 +651,18 @@ class ReceiverJetsonApp:
         if not self.running:
             return
 
-        with self._camera_lock:
-            camera_frame = self._camera_frame
-        with self._jetson_lock:
-            jetson_frame = self._jetson_frame
+        # Ask for one fresh decode of each stream before the next tick. This
+        # must precede the snapshot: any decode publishing after it clears
+        # the event, so at most one decode (into the other buffer) overlaps
+        # rendering the snapshotted frame
+        self._camera.needs_decode.set()
+        self._jetson.needs_decode.set()
+        # seq before latest: the decode thread writes them in the other
+        # order, so a frame is at worst rendered twice, never skipped
+        camera_seq = self._camera.seq
+        jetson_seq = self._jetson.seq
+        camera_frame, camera_size = self._camera.latest or (None, None)
+        jetson_frame, jetson_size = self._jetson.latest or (None, None)
 
         # Render left panel (camera)
         if camera_frame is not None:
@@ -417,10 +670,16 @@ class ReceiverJetsonApp:
             ch = self.feed_canvas.winfo_height()
             if cw < 2 or ch < 2:
                 cw, ch = DISPLAY_W, DISPLAY_H
-            photo, _, _ = rgb_to_photoimage(camera_frame, cw, ch)
-            self._feed_photo = photo
-            self.feed_canvas.delete("all")
-            self.feed_canvas.create_image(cw // 2, ch // 2, image=photo)
+            resized = (cw, ch) != self._feed_size
+            if resized:
+                self._feed_size = (cw, ch)
+                self.feed_canvas.coords(self._feed_item, cw // 2, ch // 2)
+            # Only rebuild the panel for a new frame or a new canvas size
+            if resized or camera_seq != self._camera_shown_seq:
+                self._camera_shown_seq = camera_seq
+                photo, _, _ = rgb_to_photoimage(camera_frame, cw, ch)
+                self._feed_photo = photo
+                self.feed_canvas.itemconfigure(self._feed_item, image=photo)
 
         # Render right panel (Jetson processed)
         if jetson_frame is not None:
@@ -428,19 +687,29 @@ class ReceiverJetsonApp:
             ch = self.result_canvas.winfo_height()
             if cw < 2 or ch < 2:
                 cw, ch = DISPLAY_W, DISPLAY_H
-            photo, _, _ = rgb_to_photoimage(jetson_frame, cw, ch)
-            self._result_photo = photo
-            self.result_canvas.delete("all")
-            self.result_canvas.create_image(cw // 2, ch // 2, image=photo)
-
-        # Append new VLM messages to text widget
+            resized = (cw, ch) != self._result_size
+            if resized:
+                self._result_size = (cw, ch)
+                self.result_canvas.coords(self._result_item, cw // 2, ch // 2)
+            # Only rebuild the panel for a new frame or a new canvas size
+            if resized or jetson_seq != self._jetson_shown_seq:
+                self._jetson_shown_seq = jetson_seq
+                photo, _, _ = rgb_to_photoimage(jetson_frame, cw, ch)
+                self._result_photo = photo
+                self.result_canvas.itemconfigure(self._result_item, image=photo)
+
+        # Append new VLM messages to text widget in a single insert; anything
+        # older than the deque's window was dropped before it was rendered
+        new_msgs = None
         with self._vlm_lock:
-            new_msgs = self._vlm_messages[self._vlm_rendered_count:]
-            self._vlm_rendered_count = len(self._vlm_messages)
+            unseen = min(self._vlm_total_seen - self._vlm_rendered_count,
+                         len(self._vlm_messages))
+            if unseen:
+                new_msgs = list(self._vlm_messages)[-unseen:]
+            self._vlm_rendered_count = self._vlm_total_seen
         if new_msgs:
             self.vlm_text.configure(state="normal")
-            for msg in new_msgs:
-                self.vlm_text.insert("end", msg + "\n")
+            self.vlm_text.insert("end", "\n".join(new_msgs) + "\n")
             self.vlm_text.see("end")
             self.vlm_text.configure(state="disabled")
 
@@ -450,10 +719,10 @@ class ReceiverJetsonApp:
                 f"Waiting for camera on port {self.args.port} ...")
             self.status_label.configure(style="Warn.TLabel")
         elif camera_frame is not None:
-            fh, fw = camera_frame.shape[:2]
+            fw, fh = camera_size
             cam_str = f"Cam: {fw}x{fh} {self._camera_fps:.0f}fps"
             if self._jetson_connected and jetson_frame is not None:
-                jh, jw = jetson_frame.shape[:2]
+                jw, jh = jetson_size
                 jet_str = f"Jetson: {jw}x{jh} {self._jetson_fps:.0f}fps"
                 self.status_var.set(f"{cam_str} | {jet_str}")
                 self.status_label.configure(style="Status.TLabel")
@@ -476,28 +745,36 @@ class ReceiverJetsonApp:
     # -- Actions --
 
     def save_raw(self):
-        with self._camera_lock:
-            frame = self._camera_frame
-        if frame is None:
+        with self._camera.lock:
+            jpeg_data = self._camera.jpeg
+        if jpeg_data is None:
             self.status_var.set("No camera frame to save")
             self.status_label.configure(style="Warn.TLabel")
             return
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         fname = f"raw_{ts}.jpg"
-        cv2.imwrite(fname, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        # The received JPEG is written as-is: newest frame, no re-encode
+        with open(fname, "wb") as f:
+            f.write(jpeg_data)
         self.status_var.set(f"Saved raw: {fname}")
         self.status_label.configure(style="Status.TLabel")
 
     def save_processed(self):
-        with self._jetson_lock:
-            frame = self._jetson_frame
-        if frame is None:
+        with self._jetson.lock:
+            jpeg_data = self._jetson.jpeg
+        latest = self._jetson.latest
+        if jpeg_data is None and latest is None:
             self.status_var.set("No processed frame to save")
             self.status_label.configure(style="Warn.TLabel")
             return
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         fname = f"processed_{ts}.jpg"
-        cv2.imwrite(fname, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        if jpeg_data is None:
+            # Raw return stream: encode the displayed frame
+            cv2.imwrite(fname, cv2.cvtColor(latest[0], cv2.COLOR_RGB2BGR))
+        else:
+            with open(fname, "wb") as f:
+                f.write(jpeg_data)
         self.status_var.set(f"Saved processed: {fname}")
         self.status_label.configure(style="Status.TLabel")
 
@@ -524,6 +801,9 @@ def main():
                          "(default 9002)")
     ap.add_argument("--vlm-port", type=int, default=9003,
                     help="UDP port to receive VLM analysis text (default 9003)")
+    ap.add_argument("--raw-return", action="store_true",
+                    help="Jetson returns raw display-size RGB instead of "
+                         "JPEG (skips decoding on the Pi)")
     args = ap.parse_args()
 
     root = tk.Tk()
@@ -18,6 +18,7 @@ Usage:
 import argparse
 import base64
 import glob as globmod
+import importlib.util
 import io
 import json
 import os
@@ -35,12 +36,17 @@ from tkinter import ttk
 import anthropic
 import cv2
 import numpy as np
-import torch
+import onnxruntime as ort
 from dotenv import load_dotenv
 from elevenlabs.client import ElevenLabs
-from PIL import Image, ImageTk
-from scipy.signal import resample_poly
-from silero_vad import load_silero_vad, VADIterator
+from elevenlabs.core import ApiError
+from scipy.signal import firwin, resample_poly
+
+# numba is optional — without it we fall back to scipy's resample_poly
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 load_dotenv()
 
@@ -52,8 +58,20 @@ load_dotenv()
 DISPLAY_W = 380
 DISPLAY_H = 140
 MAX_UDP_RECV = 65535
+FRAME_HEADER = struct.Struct(">I")  # 4-byte big-endian length prefix
+FRAG_HEADER = struct.Struct(">IHH")  # Jetson return: frame_id, frag_idx, frag_count
+MAX_FRAGMENT_RECV = 2048   # Jetson return fragments are <= 1400 B of payload
+REASSEMBLY_FRAMES = 4      # partial frames kept while waiting for fragments
 VLM_LOG_LINES = 4
 
+# libjpeg can decode at 1/2, 1/4 or 1/8 size in the IDCT, far cheaper than
+# a full decode plus resize; OpenCV exposes the same through IMREAD_REDUCED_*
+JPEG_SCALE_DENOMS = (8, 4, 2)
+CV_REDUCED_COLOR = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                    4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+PPM_HEADER = b"P6 %d %d 255\n"  # binary RGB, fed to Tk via PhotoImage(data=)
+
 # Audio constants
 AUDIO_RATE = 44100        # Sample rate from ESP32
 VAD_RATE = 16000          # Silero VAD expected rate
@@ -70,7 +88,15 @@ VAD_THRESHOLD = 0.3
 # ElevenLabs TTS config
 TTS_VOICE_ID = "JBFqnCBsd6RMkjVDRZzb"
 TTS_MODEL_ID = "eleven_multilingual_v2"
-TTS_OUTPUT_FORMAT = "mp3_44100_128"
+# Raw 16-bit mono PCM at the ESP32 DAC rate, so no MP3 decode is needed.
+# ElevenLabs serves pcm_44100 on Pro tier and up only; if it refuses a
+# request in it (HTTP 4xx), TTS switches to TTS_FALLBACK_FORMAT (through
+# ffmpeg) for the rest of the run. Override with --tts-format; the MP3
+# formats are the ones ffmpeg can decode without raw-input flags.
+TTS_OUTPUT_FORMAT = "pcm_44100"
+TTS_FALLBACK_FORMAT = "mp3_44100_128"
+TTS_FORMATS = (TTS_OUTPUT_FORMAT, "mp3_22050_32", "mp3_44100_64",
+               "mp3_44100_96", "mp3_44100_128", "mp3_44100_192")
 
 # Claude config
 CLAUDE_MODEL = "claude-opus-4-6"
@@ -100,6 +126,7 @@ STEP_CHECK_SYSTEM = (
     "0-indexed step numbers. If no steps are completed, return "
     "{\"completed\": []}."
 )
+STEP_CHECK_MIN_INTERVAL = 2.0  # seconds between step-check Claude calls
 
 # ---------------------------------------------------------------------------
 # DS18B20 temperature sensor helpers
@@ -141,34 +168,290 @@ def read_temperature(device_path):
 # Display helpers
 # ---------------------------------------------------------------------------
 
-def rgb_to_photoimage(rgb_array, max_w, max_h):
-    """Convert an RGB numpy array to a tkinter PhotoImage, fit within bounds."""
+def jpeg_size(jpeg_data):
+    """Return (width, height) from a JPEG's SOF header, or None."""
+    i, n = 2, len(jpeg_data)
+    while i + 9 <= n:
+        if jpeg_data[i] != 0xFF:
+            return None
+        marker = jpeg_data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        # SOF0..SOF15, excluding DHT / JPG / DAC which share the range
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack_from(">HH", jpeg_data, i + 5)
+            return w, h
+        i += 2 + int.from_bytes(jpeg_data[i + 2:i + 4], "big")
+    return None
+
+
+def scale_denom(src_w, src_h, max_w, max_h):
+    """Largest JPEG decode denominator that still fills max_w x max_h."""
+    need = min(max_w / src_w, max_h / src_h, 1.0)
+    for denom in JPEG_SCALE_DENOMS:
+        if 1.0 / denom >= need:
+            return denom
+    return 1
+
+
+def decode_for_display(jpeg_data, max_w, max_h):
+    """Decode a JPEG at the smallest DCT scale that still fills the panel.
+    Returns (rgb, full (w, h)), or (None, None) if corrupt."""
+    size = jpeg_size(jpeg_data)
+    denom = 1 if size is None else scale_denom(*size, max_w, max_h)
+    bgr = cv2.imdecode(np.frombuffer(jpeg_data, dtype=np.uint8),
+                       CV_REDUCED_COLOR[denom])
+    if bgr is None:
+        return None, None
+    # Swap channels in place; the decoded array is ours alone
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=bgr)
+    return rgb, size or (rgb.shape[1], rgb.shape[0])
+
+
+def rgb_to_photoimage(rgb_array, max_w, max_h, out=None):
+    """Convert an RGB numpy array to a tkinter PhotoImage, fit within bounds.
+
+    A downscale is written into `out` when it already has the target shape,
+    so a panel reuses one buffer across frames. The pixels go to Tk as an
+    in-memory binary PPM, with no PIL round-trip. Returns (photo, w, h, buf);
+    pass buf back as `out` on the next call.
+    """
     h, w = rgb_array.shape[:2]
     scale = min(max_w / w, max_h / h, 1.0)
     new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
     if scale < 1.0:
-        resized = cv2.resize(rgb_array, (new_w, new_h),
+        if out is None or out.shape != (new_h, new_w, 3):
+            out = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        resized = cv2.resize(rgb_array, (new_w, new_h), dst=out,
                              interpolation=cv2.INTER_AREA)
     else:
-        resized = rgb_array
-    pil_img = Image.fromarray(resized)
-    return ImageTk.PhotoImage(pil_img), new_w, new_h
+        resized = np.ascontiguousarray(rgb_array)
+    ppm = PPM_HEADER % (new_w, new_h) + resized.tobytes()
+    return tk.PhotoImage(width=new_w, height=new_h, data=ppm,
+                         format="PPM"), new_w, new_h, out
+
+
+# 44100 -> 16000 Hz polyphase resampler for the VAD
+RESAMPLE_UP = 160
+RESAMPLE_DOWN = 441
+
+# Same anti-aliasing filter resample_poly designs internally, built once
+_max_rate = max(RESAMPLE_UP, RESAMPLE_DOWN)
+RESAMPLE_FIR = firwin(2 * 10 * _max_rate + 1, 1.0 / _max_rate,
+                      window=('kaiser', 5.0)) * RESAMPLE_UP
+# Q15 fixed-point taps (|h| < 0.4) so the JIT kernel stays in integer math
+RESAMPLE_FIR_Q15 = np.round(RESAMPLE_FIR * 32768.0).astype(np.int16)
+
+
+def _polyphase_resample_i16(x, h_q15, up, down, out):
+    """int16 -> normalized float32 polyphase resample, filling all of out.
+
+    Equivalent to resample_poly(x / 32768, up, down) trimmed/zero-padded to
+    out.size, but only evaluates the taps that hit non-zero upsampled
+    samples, with the /32768 normalization folded into the final scale.
+    """
+    delay = (h_q15.size - 1) // 2
+    for n in range(out.size):
+        j = n * down + delay
+        k = j % up
+        i = (j - k) // up
+        acc = np.int64(0)
+        while k < h_q15.size and i >= 0:
+            if i < x.size:
+                acc += np.int64(h_q15[k]) * np.int64(x[i])
+            k += up
+            i -= 1
+        out[n] = acc * (1.0 / (32768.0 * 32768.0))
+    return out
+
+
+if njit is not None:
+    _polyphase_resample_i16 = njit(cache=True, fastmath=True)(
+        _polyphase_resample_i16)
+
+
+def resample_audio(audio_44k, out=None, scratch=None):
+    """Resample int16 audio from 44100 Hz to exactly one VAD chunk.
+
+    Returns a float32 array of VAD_CHUNK_SAMPLES at 16000 Hz, normalized to
+    [-1, 1], written into `out` when given. `scratch` (float32, same length
+    as the input) is only used by the scipy fallback for the normalized
+    input.
+    """
+    if out is None:
+        out = np.empty(VAD_CHUNK_SAMPLES, dtype=np.float32)
+    if njit is not None:
+        _polyphase_resample_i16(
+            audio_44k, RESAMPLE_FIR_Q15, RESAMPLE_UP, RESAMPLE_DOWN, out)
+    else:
+        # Cast and normalize in one pass
+        audio_float = np.multiply(audio_44k, np.float32(1.0 / 32768.0),
+                                  out=scratch, dtype=np.float32)
+        resampled = resample_poly(audio_float, RESAMPLE_UP, RESAMPLE_DOWN)
+        # Ensure exactly 512 samples by padding or trimming
+        n = min(len(resampled), VAD_CHUNK_SAMPLES)
+        out[:n] = resampled[:n]
+        out[n:] = 0.0
+    return out
+
 
+# ---------------------------------------------------------------------------
+# Voice activity detection
+# ---------------------------------------------------------------------------
+
+class VadStateMachine:
+    """Silero VADIterator's start/end logic, driven by a precomputed prob.
+
+    VADIterator runs the model itself, so using it alongside our own
+    speech_prob call ran the (stateful) model twice per chunk.  Here the
+    model is invoked once and its probability is replayed through the same
+    hysteresis / min-silence / speech-pad rules.
+    """
+
+    def __init__(self, threshold, sampling_rate, min_silence_duration_ms,
+                 speech_pad_ms):
+        self.threshold = threshold
+        self.min_silence_samples = sampling_rate * min_silence_duration_ms / 1000
+        self.speech_pad_samples = sampling_rate * speech_pad_ms / 1000
+        self.reset()
+
+    def reset(self):
+        self.triggered = False
+        self.temp_end = 0
+        self.current_sample = 0
+
+    def __call__(self, speech_prob, window_size_samples):
+        """Advance by one window; return {'start': n}, {'end': n} or None."""
+        self.current_sample += window_size_samples
+
+        if speech_prob >= self.threshold and self.temp_end:
+            self.temp_end = 0
+
+        if speech_prob >= self.threshold and not self.triggered:
+            self.triggered = True
+            start = max(0, self.current_sample - self.speech_pad_samples
+                        - window_size_samples)
+            return {'start': int(start)}
+
+        if speech_prob < self.threshold - 0.15 and self.triggered:
+            if not self.temp_end:
+                self.temp_end = self.current_sample
+            if self.current_sample - self.temp_end < self.min_silence_samples:
+                return None
+            end = self.temp_end + self.speech_pad_samples - window_size_samples
+            self.temp_end = 0
+            self.triggered = False
+            return {'end': int(end)}
 
-def resample_audio(audio_44k, up=160, down=441):
-    """Resample audio from 44100 Hz to 16000 Hz using scipy.
+        return None
 
-    Args:
-        audio_44k: numpy int16 array at 44100 Hz
-        up: upsample factor (160 for 44100→16000)
-        down: downsample factor (441 for 44100→16000)
 
-    Returns:
-        torch float32 tensor at 16000 Hz, normalized to [-1, 1]
+def silero_onnx_path():
+    """Path of the ONNX model bundled with the silero-vad package, found
+    without importing it (its __init__ pulls in torch)."""
+    spec = importlib.util.find_spec("silero_vad")
+    if spec is None or not spec.submodule_search_locations:
+        raise RuntimeError("silero-vad is not installed")
+    return os.path.join(spec.submodule_search_locations[0], "data",
+                        "silero_vad.onnx")
+
+
+class SileroVadRunner:
+    """Silero VAD ONNX session driven through IOBinding.
+
+    Stands in for silero's OnnxWrapper on the hot path. The model input
+    (64-sample context + 512-sample window), the recurrent state and the
+    outputs are preallocated numpy buffers bound once, so a window costs a
+    resample into `window` plus run_with_iobinding(); no torch.cat and no
+    per-call tensor or output allocation.
     """
-    audio_float = audio_44k.astype(np.float32) / 32768.0
-    resampled = resample_poly(audio_float, up, down)
-    return torch.from_numpy(resampled.astype(np.float32))
+
+    CONTEXT = 64  # trailing samples of the previous window, as OnnxWrapper
+
+    def __init__(self, model_path):
+        # Silero's own choice of one thread: for a 576-sample LSTM step the
+        # thread-pool hand-off costs more than it parallelizes
+        opts = ort.SessionOptions()
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = 1
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+        self._input = np.zeros((1, self.CONTEXT + VAD_CHUNK_SAMPLES),
+                               dtype=np.float32)
+        self.window = self._input[0, self.CONTEXT:]  # fill before each call
+        self._sr = np.array(VAD_RATE, dtype=np.int64)
+        self._prob = np.zeros((1, 1), dtype=np.float32)
+        # Two state buffers: each binding reads one and writes the other,
+        # and calls alternate between the bindings
+        self._states = [np.zeros((2, 1, 128), dtype=np.float32)
+                        for _ in range(2)]
+        prob_name, state_name = [o.name for o in self.session.get_outputs()]
+        self._bindings = []
+        for i in range(2):
+            binding = self.session.io_binding()
+            for name, arr in (("input", self._input),
+                              ("state", self._states[i]),
+                              ("sr", self._sr)):
+                binding.bind_input(name, "cpu", 0, arr.dtype, list(arr.shape),
+                                   arr.ctypes.data)
+            for name, arr in ((prob_name, self._prob),
+                              (state_name, self._states[1 - i])):
+                binding.bind_output(name, "cpu", 0, arr.dtype,
+                                    list(arr.shape), arr.ctypes.data)
+            self._bindings.append(binding)
+        self._next = 0
+
+    def __call__(self):
+        """Run one window (already written to `window`); return its prob."""
+        self.session.run_with_iobinding(self._bindings[self._next])
+        self._next ^= 1
+        # This window's tail is the next window's context
+        self._input[0, :self.CONTEXT] = self._input[0, -self.CONTEXT:]
+        return float(self._prob[0, 0])
+
+
+# ---------------------------------------------------------------------------
+# Jetson return-frame reassembly
+# ---------------------------------------------------------------------------
+
+class FrameReassembler:
+    """Rebuilds processed JPEG frames from the Jetson's fragments.
+    Each datagram is FRAG_HEADER (frame_id, frag_idx, frag_count) + payload.
+    At most REASSEMBLY_FRAMES partial frames are kept; when a frame
+    completes, any older partial frames are dropped as stale."""
+
+    def __init__(self):
+        self._pending = {}  # frame_id -> [remaining, parts], insertion-ordered
+
+    def add(self, data):
+        """Add one fragment; return the completed JPEG bytes or None."""
+        if len(data) <= FRAG_HEADER.size:
+            return None
+        frame_id, idx, count = FRAG_HEADER.unpack_from(data)
+        if idx >= count:
+            return None
+
+        entry = self._pending.get(frame_id)
+        if entry is None:
+            if len(self._pending) >= REASSEMBLY_FRAMES:
+                del self._pending[next(iter(self._pending))]
+            entry = self._pending[frame_id] = [count, [None] * count]
+        parts = entry[1]
+        if len(parts) != count or parts[idx] is not None:
+            return None
+        parts[idx] = bytes(data[FRAG_HEADER.size:])  # data may alias a recv buffer
+        entry[0] -= 1
+        if entry[0]:
+            return None
+
+        for stale_id in list(self._pending):
+            del self._pending[stale_id]
+            if stale_id == frame_id:
+                break
+        return b"".join(parts)
 
 
 # ---------------------------------------------------------------------------
@@ -247,26 +530,46 @@ class ReceiverJetsonFullApp:
         self.running = True
 
         # Video state
+        # *_frame is decoded at display scale; *_jpeg (full resolution, as
+        # received) is what gets saved and sent to Claude
         self._camera_frame = None
         self._jetson_frame = None
+        self._camera_jpeg = None
+        self._jetson_jpeg = None
+        self._camera_size = None  # full (w, h) of each stream
+        self._jetson_size = None
         self._camera_lock = threading.Lock()
         self._jetson_lock = threading.Lock()
+        # Canvas sizes, refreshed by the display tick, pick the decode scale
+        self._feed_size = (DISPLAY_W, DISPLAY_H)
+        self._result_size = (DISPLAY_W, DISPLAY_H)
+        # Bumped on each published frame; each panel records the seq it last
+        # rendered so a tick with no new frame does no image work
+        self._camera_seq = 0
+        self._jetson_seq = 0
+        self._camera_shown_seq = 0
+        self._jetson_shown_seq = 0
+        # Per-panel resize buffers, allocated at the first frame
+        self._feed_buf = None
+        self._result_buf = None
         self._camera_connected = False
         self._jetson_connected = False
 
-        # FPS tracking
+        # FPS tracking: receive threads only bump the counters; the Tk
+        # thread turns them into rates once a second (_update_fps)
         self._camera_fps = 0.0
         self._jetson_fps = 0.0
         self._camera_frame_count = 0
         self._jetson_frame_count = 0
-        self._camera_fps_time = time.monotonic()
-        self._jetson_fps_time = time.monotonic()
+        self._fps_counts = (0, 0)
+        self._fps_time = time.monotonic()
 
         # VLM message state
         self._vlm_messages = []
         self._vlm_lock = threading.Lock()
         self._vlm_max_messages = 50
         self._vlm_rendered_count = 0
+        self._vlm_total_seen = 0  # absolute count, survives list trimming
 
         # DS18B20 temperature state
         self._temp_c = None
@@ -310,6 +613,11 @@ class ReceiverJetsonFullApp:
         self._task_queue_updated = False
         self._task_completion_dirty = False
         self._step_check_in_progress = False
+        # Incremental step checks: only VLM messages past the checkpoint
+        # (an absolute _vlm_total_seen count) are sent for the current steps
+        self._step_check_seen = 0
+        self._step_check_steps = None
+        self._step_check_last = 0.0  # monotonic time of the last call
 
         # Socket for forwarding to Jetson
         self._fwd_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -323,13 +631,13 @@ class ReceiverJetsonFullApp:
         self._elevenlabs_client = ElevenLabs(
             api_key=os.getenv("ELEVENLABS_API_KEY"),
         )
+        self._tts_format = args.tts_format
 
         # Load Silero VAD (ONNX mode — avoids torch.jit issues on RPi)
         print("Loading Silero VAD (ONNX)...")
-        self._vad_model = load_silero_vad(onnx=True)
+        self._vad_model = SileroVadRunner(silero_onnx_path())
         print("Silero VAD loaded.")
-        self._vad_iterator = VADIterator(
-            self._vad_model,
+        self._vad_iterator = VadStateMachine(
             threshold=VAD_THRESHOLD,
             sampling_rate=VAD_RATE,
             min_silence_duration_ms=MIN_SILENCE_DURATION_MS,
@@ -339,6 +647,7 @@ class ReceiverJetsonFullApp:
         self._build_gui()
         self._start_network_threads()
         self._update_display()
+        self.root.after(1000, self._update_fps)
 
     # -- Network threads --
 
@@ -353,13 +662,16 @@ class ReceiverJetsonFullApp:
             threading.Thread(target=self._temp_poll_loop, daemon=True).start()
 
     def _recv_exactly(self, conn, n):
-        """Read exactly *n* bytes from a TCP socket, or return None on EOF."""
-        buf = b''
-        while len(buf) < n:
-            chunk = conn.recv(n - len(buf))
-            if not chunk:
+        """Read exactly *n* bytes from a TCP socket, or return None on EOF.
+        Fills one preallocated buffer in place instead of concatenating."""
+        buf = bytearray(n)
+        mv = memoryview(buf)
+        off = 0
+        while off < n:
+            got = conn.recv_into(mv[off:], n - off)
+            if not got:
                 return None
-            buf += chunk
+            off += got
         return buf
 
     def _camera_recv_loop(self):
@@ -370,6 +682,7 @@ class ReceiverJetsonFullApp:
         server.listen(1)
         server.settimeout(1.0)
         print(f"Listening for camera on TCP port {self.args.port} ...")
+        jetson_addr = (self.args.jetson_host, self.args.jetson_port)
 
         while self.running:
             # Accept a connection from the sender
@@ -392,37 +705,31 @@ class ReceiverJetsonFullApp:
                     self._camera_connected = False
                     break
 
-                frame_len = struct.unpack(">I", header)[0]
+                frame_len = FRAME_HEADER.unpack(header)[0]
                 jpeg_data = self._recv_exactly(conn, frame_len)
                 if jpeg_data is None:
                     print(f"Camera disconnected from {addr}")
                     self._camera_connected = False
                     break
 
-                bgr = cv2.imdecode(
-                    np.frombuffer(jpeg_data, dtype=np.uint8), cv2.IMREAD_COLOR)
-                if bgr is None:
+                rgb, size = decode_for_display(jpeg_data, *self._feed_size)
+                if rgb is None:
                     continue
-                rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
 
                 with self._camera_lock:
                     self._camera_frame = rgb
+                    self._camera_jpeg = jpeg_data
+                    self._camera_size = size
+                    self._camera_seq += 1
 
                 self._camera_frame_count += 1
-                now = time.monotonic()
-                elapsed = now - self._camera_fps_time
-                if elapsed >= 1.0:
-                    self._camera_fps = self._camera_frame_count / elapsed
-                    self._camera_frame_count = 0
-                    self._camera_fps_time = now
-
-                # Forward to Jetson (still UDP) once experience has started
+
+                # Forward to Jetson (still UDP) once experience has started;
+                # sendmsg gathers header + JPEG into one datagram, no concat
                 if self._experience_started:
-                    fwd_data = header + jpeg_data
                     try:
-                        self._fwd_sock.sendto(
-                            fwd_data,
-                            (self.args.jetson_host, self.args.jetson_port))
+                        self._fwd_sock.sendmsg(
+                            [header, jpeg_data], (), 0, jetson_addr)
                     except OSError:
                         pass
 
@@ -438,42 +745,39 @@ class ReceiverJetsonFullApp:
         sock.bind(("0.0.0.0", self.args.return_port))
         print(f"Listening for Jetson return on UDP port {self.args.return_port} ...")
 
+        reassembler = FrameReassembler()
+        recv_buf = bytearray(MAX_FRAGMENT_RECV)
+        recv_view = memoryview(recv_buf)
         while self.running:
             sock.settimeout(1.0)
             try:
-                data, addr = sock.recvfrom(MAX_UDP_RECV)
+                nbytes, addr = sock.recvfrom_into(recv_buf)
             except socket.timeout:
                 continue
             except OSError:
                 continue
+            data = recv_view[:nbytes]
 
             if not self._jetson_connected:
                 print(f"Jetson receiving from {addr}")
                 self._jetson_connected = True
 
-            if len(data) < 4:
-                continue
-            frame_len = struct.unpack(">I", data[:4])[0]
-            jpeg_data = data[4:]
-            if len(jpeg_data) != frame_len:
+            # Reassemble; only a complete frame is decoded
+            jpeg_data = reassembler.add(data)
+            if jpeg_data is None:
                 continue
 
-            bgr = cv2.imdecode(
-                np.frombuffer(jpeg_data, dtype=np.uint8), cv2.IMREAD_COLOR)
-            if bgr is None:
+            rgb, size = decode_for_display(jpeg_data, *self._result_size)
+            if rgb is None:
                 continue
-            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
 
             with self._jetson_lock:
                 self._jetson_frame = rgb
+                self._jetson_jpeg = jpeg_data
+                self._jetson_size = size
+                self._jetson_seq += 1
 
             self._jetson_frame_count += 1
-            now = time.monotonic()
-            elapsed = now - self._jetson_fps_time
-            if elapsed >= 1.0:
-                self._jetson_fps = self._jetson_frame_count / elapsed
-                self._jetson_frame_count = 0
-                self._jetson_fps_time = now
 
         sock.close()
 
@@ -492,17 +796,19 @@ class ReceiverJetsonFullApp:
         sock.bind(("0.0.0.0", self.args.vlm_port))
         print(f"Listening for VLM analysis on UDP port {self.args.vlm_port} ...")
 
+        recv_buf = bytearray(MAX_UDP_RECV)
+        recv_view = memoryview(recv_buf)
         while self.running:
             sock.settimeout(1.0)
             try:
-                data, addr = sock.recvfrom(MAX_UDP_RECV)
+                nbytes, addr = sock.recvfrom_into(recv_buf)
             except socket.timeout:
                 continue
             except OSError:
                 continue
 
             try:
-                msg = data.decode("utf-8")
+                msg = str(recv_view[:nbytes], "utf-8")
             except UnicodeDecodeError:
                 continue
 
@@ -511,13 +817,7 @@ class ReceiverJetsonFullApp:
             if temp is not None:
                 msg = f"{msg}  [Temp: {temp:.1f}\u00b0C / {temp * 9 / 5 + 32:.1f}\u00b0F]"
 
-            with self._vlm_lock:
-                self._vlm_messages.append(msg)
-                if len(self._vlm_messages) > self._vlm_max_messages:
-                    self._vlm_messages = self._vlm_messages[
-                        -self._vlm_max_messages:]
-                    self._vlm_rendered_count = min(
-                        self._vlm_rendered_count, len(self._vlm_messages))
+            self._append_vlm_message(msg)
 
             # Trigger step completion check on each new VLM entry
             if self._experience_started:
@@ -561,7 +861,7 @@ class ReceiverJetsonFullApp:
                 client_sock.close()
                 return
 
-            payload_len = struct.unpack('>I', header)[0]
+            payload_len = FRAME_HEADER.unpack(header)[0]
             if payload_len > 10 * 1024 * 1024:  # 10 MB max
                 print(f"Recipe connection from {addr}: payload too large ({payload_len} bytes)")
                 client_sock.close()
@@ -719,9 +1019,14 @@ class ReceiverJetsonFullApp:
         with self._recipe_lock:
             if not self._recipe_steps:
                 return
-        if self._step_check_in_progress:
+        # Rate-limit so a burst of VLM entries doesn't queue up Claude calls;
+        # skipped entries are picked up by the next check
+        now = time.monotonic()
+        if (self._step_check_in_progress
+                or now - self._step_check_last < STEP_CHECK_MIN_INTERVAL):
             return
         self._step_check_in_progress = True
+        self._step_check_last = now
         threading.Thread(
             target=self._check_step_completion, daemon=True).start()
 
@@ -730,26 +1035,46 @@ class ReceiverJetsonFullApp:
         try:
             with self._recipe_lock:
                 steps = list(self._recipe_steps)
+                done = [i for i, c in enumerate(self._task_completed) if c]
             if not steps:
                 return
 
+            # New recipe: judge the whole log window against it again
+            checkpoint = self._step_check_seen
+            if steps != self._step_check_steps:
+                checkpoint = 0
             with self._vlm_lock:
-                vlm_log = "\n".join(self._vlm_messages)
+                total = self._vlm_total_seen
+                unseen = min(total - checkpoint, len(self._vlm_messages))
+                new_msgs = self._vlm_messages[len(self._vlm_messages) - unseen:]
+            if not new_msgs:
+                return
 
             steps_text = "\n".join(
                 f"{i}. {s}" for i, s in enumerate(steps))
 
-            prompt = (
-                f"Recipe steps:\n{steps_text}\n\n"
-                f"Kitchen camera observations:\n{vlm_log}\n\n"
-                f"Based on these observations, which steps are completed?"
-            )
+            # The steps block is stable across calls, so it is marked for
+            # prompt caching; only progress and new observations vary
+            content = [
+                {"type": "text",
+                 "text": f"Recipe steps:\n{steps_text}",
+                 "cache_control": {"type": "ephemeral"}},
+                {"type": "text",
+                 "text": (
+                     f"Previously completed: {json.dumps({'completed': done})}"
+                     f"\n\nNew kitchen camera observations:\n"
+                     + "\n".join(new_msgs)
+                     + "\n\nBased on these observations, which steps are "
+                       "completed? Include the previously completed ones."),
+                 },
+            ]
 
             response = self._claude_client.messages.create(
                 model=CLAUDE_MODEL,
                 max_tokens=256,
-                system=STEP_CHECK_SYSTEM,
-                messages=[{"role": "user", "content": prompt}],
+                system=[{"type": "text", "text": STEP_CHECK_SYSTEM,
+                         "cache_control": {"type": "ephemeral"}}],
+                messages=[{"role": "user", "content": content}],
             )
             text = response.content[0].text.strip()
 
@@ -764,12 +1089,21 @@ class ReceiverJetsonFullApp:
             completed_indices = result.get("completed", [])
 
             with self._recipe_lock:
+                # The recipe may have been replaced during the call
+                if self._recipe_steps != steps:
+                    return
+                # Steps stay completed once seen done; the new observations
+                # alone no longer show earlier evidence
                 self._task_completed = [False] * len(self._recipe_steps)
-                for idx in completed_indices:
+                for idx in set(done) | set(completed_indices):
                     if 0 <= idx < len(self._task_completed):
                         self._task_completed[idx] = True
                 self._task_completion_dirty = True
 
+            # Advance the checkpoint only after a successful parse
+            self._step_check_seen = total
+            self._step_check_steps = steps
+
             print(f"Step check: completed = {completed_indices}")
 
         except Exception as e:
@@ -790,7 +1124,14 @@ class ReceiverJetsonFullApp:
         samples_needed_44k = int(VAD_CHUNK_SAMPLES * AUDIO_RATE / VAD_RATE)
         bytes_needed = samples_needed_44k * AUDIO_SAMPLE_WIDTH
 
-        packet_buffer = b''
+        # Packets are received straight into the VAD buffer after any
+        # leftover (sub-chunk) bytes; only accepted bytes advance vad_fill
+        vad_buffer = bytearray(bytes_needed + AUDIO_BUFFER_SIZE)
+        vad_view = memoryview(vad_buffer)
+        vad_fill = 0
+        # Scratch for the resampler fallback; the resampled window is written
+        # straight into the VAD model's bound input buffer
+        vad_scratch = np.empty(samples_needed_44k, dtype=np.float32)
         is_recording = False
         recorded_chunks = []
         chunk_count = 0
@@ -798,7 +1139,8 @@ class ReceiverJetsonFullApp:
         while self.running:
             sock.settimeout(1.0)
             try:
-                data, addr = sock.recvfrom(AUDIO_BUFFER_SIZE)
+                nbytes, addr = sock.recvfrom_into(
+                    vad_view[vad_fill:], AUDIO_BUFFER_SIZE)
             except socket.timeout:
                 continue
             except OSError:
@@ -811,7 +1153,8 @@ class ReceiverJetsonFullApp:
             # Collect chunks for manual recording (Ask button)
             with self._manual_lock:
                 if self._manual_recording:
-                    self._manual_chunks.append(data)
+                    self._manual_chunks.append(
+                        bytes(vad_view[vad_fill:vad_fill + nbytes]))
 
             # Check cooldown — skip VAD while in post-speech cooldown
             if time.monotonic() - self._last_speak_end < self._speak_cooldown:
@@ -821,38 +1164,32 @@ class ReceiverJetsonFullApp:
             if self._muted:
                 continue
 
-            packet_buffer += data
+            vad_fill += nbytes
 
-            while len(packet_buffer) >= bytes_needed:
-                chunk_original = packet_buffer[:bytes_needed]
-                packet_buffer = packet_buffer[bytes_needed:]
+            while vad_fill >= bytes_needed:
+                # Recorded chunks outlive the buffer, so this is the one copy
+                chunk_original = bytes(vad_view[:bytes_needed])
+                vad_fill -= bytes_needed
+                vad_buffer[:vad_fill] = vad_view[bytes_needed:bytes_needed + vad_fill]
 
-                # Convert to numpy int16
-                audio_44k = np.frombuffer(chunk_original, dtype=np.int16).copy()
+                # Convert to numpy int16 (read-only view of the chunk)
+                audio_44k = np.frombuffer(chunk_original, dtype=np.int16)
 
-                # Resample 44100 → 16000 using scipy
-                audio_16k = resample_audio(audio_44k)
-
-                # Ensure exactly 512 samples
-                if len(audio_16k) < VAD_CHUNK_SAMPLES:
-                    padding = VAD_CHUNK_SAMPLES - len(audio_16k)
-                    audio_16k = torch.nn.functional.pad(audio_16k, (0, padding))
-                elif len(audio_16k) > VAD_CHUNK_SAMPLES:
-                    audio_16k = audio_16k[:VAD_CHUNK_SAMPLES]
+                # Resample 44100 → 16000, exactly one 512-sample VAD window
+                resample_audio(audio_44k, self._vad_model.window, vad_scratch)
 
                 chunk_count += 1
 
-                # Get speech probability
-                with torch.no_grad():
-                    speech_prob = self._vad_model(audio_16k, VAD_RATE).item()
+                # Single model call per chunk — the state machine reuses the
+                # prob. Windows can't be batched: Silero carries RNN state
+                # from one window to the next
+                speech_prob = self._vad_model()
 
                 if chunk_count % 30 == 0:
                     print(f"Audio chunk {chunk_count}: "
                           f"speech_prob={speech_prob:.3f}")
 
-                # Process with VAD iterator
-                speech_dict = self._vad_iterator(
-                    audio_16k, return_seconds=False)
+                speech_dict = self._vad_iterator(speech_prob, VAD_CHUNK_SAMPLES)
 
                 if is_recording:
                     recorded_chunks.append(chunk_original)
@@ -902,15 +1239,9 @@ class ReceiverJetsonFullApp:
         self._append_vlm_message(f"[USER] {transcription}")
 
         # --- Step 2: Capture current frame for Claude vision ---
+        # The received full-resolution JPEG is sent as-is, no re-encode
         with self._camera_lock:
-            frame = self._camera_frame
-        frame_jpeg = None
-        if frame is not None:
-            bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            ok, encoded = cv2.imencode(
-                ".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            if ok:
-                frame_jpeg = encoded.tobytes()
+            frame_jpeg = self._camera_jpeg
 
         # --- Step 3: Build context from VLM messages and recipe steps ---
         with self._voice_lock:
@@ -1052,53 +1383,80 @@ class ReceiverJetsonFullApp:
         with self._tts_lock:
             try:
                 # Generate speech with ElevenLabs
-                audio_gen = self._elevenlabs_client.text_to_speech.convert(
-                    text=text,
-                    voice_id=TTS_VOICE_ID,
-                    model_id=TTS_MODEL_ID,
-                    output_format=TTS_OUTPUT_FORMAT,
-                )
-                audio_bytes = b''.join(audio_gen)
-
-                # Convert MP3 to WAV via ffmpeg
-                process = subprocess.Popen(
-                    [
-                        'ffmpeg', '-i', 'pipe:0',
-                        '-f', 'wav', '-acodec', 'pcm_s16le',
-                        '-ar', str(AUDIO_RATE),
-                        '-ac', '2',  # Stereo for ESP32 DAC
-                        'pipe:1',
-                    ],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.DEVNULL,
-                )
-                wav_data, _ = process.communicate(input=audio_bytes)
-
-                # Stream WAV PCM data to ESP32 using the shared socket
-                wf = wave.open(io.BytesIO(wav_data), 'rb')
-
+                try:
+                    audio_bytes = self._synthesize(text)
+                except ApiError as e:
+                    # A 4xx on PCM means a key below Pro tier: retry once
+                    # as MP3 and keep using it for the rest of the run.
+                    # Anything else (timeouts, 5xx, rate limits) is
+                    # transient and must not downgrade the run
+                    code = e.status_code or 0
+                    if (not self._tts_format.startswith("pcm_")
+                            or not 400 <= code < 500 or code == 429):
+                        raise
+                    print(f"TTS in {self._tts_format} failed ({e}); "
+                          f"falling back to {TTS_FALLBACK_FORMAT}")
+                    self._tts_format = TTS_FALLBACK_FORMAT
+                    audio_bytes = self._synthesize(text)
+
+                if self._tts_format == f"pcm_{AUDIO_RATE}":
+                    # Raw 16-bit mono already at the DAC rate: only the
+                    # stereo duplication is left, no MP3 decode
+                    mono = np.frombuffer(audio_bytes, dtype="<i2",
+                                         count=len(audio_bytes) // 2)
+                    pcm = np.repeat(mono, 2).tobytes()
+                else:
+                    # Convert MP3 to WAV via ffmpeg
+                    process = subprocess.Popen(
+                        [
+                            'ffmpeg', '-i', 'pipe:0',
+                            '-f', 'wav', '-acodec', 'pcm_s16le',
+                            '-ar', str(AUDIO_RATE),
+                            '-ac', '2',  # Stereo for ESP32 DAC
+                            'pipe:1',
+                        ],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                    )
+                    wav_data, _ = process.communicate(input=audio_bytes)
+                    with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+                        pcm = wf.readframes(wf.getnframes())
+
+                # Stream stereo PCM to ESP32 using the shared socket, in
+                # memoryview slices of the one buffer
+                pcm_view = memoryview(pcm)
                 esp32_addr = (self.args.esp32_host, self.args.esp32_audio_port)
+                frame_bytes = AUDIO_SAMPLE_WIDTH * 2
                 print(f"Streaming TTS to ESP32 at {esp32_addr} "
-                      f"({wf.getnframes() / wf.getframerate():.1f}s)")
+                      f"({len(pcm) / frame_bytes / AUDIO_RATE:.1f}s)")
 
-                while True:
-                    data = wf.readframes(TTS_FRAMES_PER_PACKET)
-                    if not data:
-                        break
-                    self._tts_sock.sendto(data, esp32_addr)
+                packet_bytes = TTS_FRAMES_PER_PACKET * frame_bytes
+                for start in range(0, len(pcm_view), packet_bytes):
+                    self._tts_sock.sendto(
+                        pcm_view[start:start + packet_bytes], esp32_addr)
                     time.sleep(TTS_FRAMES_PER_PACKET / AUDIO_RATE * 0.8)
 
-                wf.close()
                 print("TTS streaming complete.")
 
             except Exception as e:
                 print(f"TTS/streaming error: {e}")
 
+    def _synthesize(self, text):
+        """Return ElevenLabs TTS audio for text in the current format."""
+        audio_gen = self._elevenlabs_client.text_to_speech.convert(
+            text=text,
+            voice_id=TTS_VOICE_ID,
+            model_id=TTS_MODEL_ID,
+            output_format=self._tts_format,
+        )
+        return b''.join(audio_gen)
+
     def _append_vlm_message(self, msg):
         """Thread-safe append to VLM messages (shown in GUI log)."""
         with self._vlm_lock:
             self._vlm_messages.append(msg)
+            self._vlm_total_seen += 1
             if len(self._vlm_messages) > self._vlm_max_messages:
                 self._vlm_messages = self._vlm_messages[
                     -self._vlm_max_messages:]
@@ -1183,6 +1541,9 @@ class ReceiverJetsonFullApp:
                                      bg="#181825", highlightthickness=0)
         self.feed_canvas.pack(fill="both", expand=True)
         self._feed_photo = None
+        # One persistent image item; each tick only retargets its image
+        self._feed_item = self.feed_canvas.create_image(
+            DISPLAY_W // 2, DISPLAY_H // 2)
 
         right = ttk.Frame(panels)
         right.pack(side="left", fill="both", expand=True)
@@ -1193,6 +1554,8 @@ class ReceiverJetsonFullApp:
                                        bg="#181825", highlightthickness=0)
         self.result_canvas.pack(fill="both", expand=True)
         self._result_photo = None
+        self._result_item = self.result_canvas.create_image(
+            DISPLAY_W // 2, DISPLAY_H // 2)
 
         # -- VLM Analysis Log --
         vlm_frame = ttk.Frame(self.root)
@@ -1254,8 +1617,12 @@ class ReceiverJetsonFullApp:
 
         with self._camera_lock:
             camera_frame = self._camera_frame
+            camera_size = self._camera_size
+            camera_seq = self._camera_seq
         with self._jetson_lock:
             jetson_frame = self._jetson_frame
+            jetson_size = self._jetson_size
+            jetson_seq = self._jetson_seq
 
         # Render raw camera panel
         if camera_frame is not None:
@@ -1263,10 +1630,17 @@ class ReceiverJetsonFullApp:
             ch = self.feed_canvas.winfo_height()
             if cw < 2 or ch < 2:
                 cw, ch = DISPLAY_W, DISPLAY_H
-            photo, _, _ = rgb_to_photoimage(camera_frame, cw, ch)
-            self._feed_photo = photo
-            self.feed_canvas.delete("all")
-            self.feed_canvas.create_image(cw // 2, ch // 2, image=photo)
+            resized = (cw, ch) != self._feed_size
+            if resized:
+                self._feed_size = (cw, ch)
+                self.feed_canvas.coords(self._feed_item, cw // 2, ch // 2)
+            # Only rebuild the panel for a new frame or a new canvas size
+            if resized or camera_seq != self._camera_shown_seq:
+                self._camera_shown_seq = camera_seq
+                photo, _, _, self._feed_buf = rgb_to_photoimage(
+                    camera_frame, cw, ch, self._feed_buf)
+                self._feed_photo = photo
+                self.feed_canvas.itemconfigure(self._feed_item, image=photo)
 
         # Render Jetson processed panel
         if jetson_frame is not None:
@@ -1274,10 +1648,17 @@ class ReceiverJetsonFullApp:
             ch = self.result_canvas.winfo_height()
             if cw < 2 or ch < 2:
                 cw, ch = DISPLAY_W, DISPLAY_H
-            photo, _, _ = rgb_to_photoimage(jetson_frame, cw, ch)
-            self._result_photo = photo
-            self.result_canvas.delete("all")
-            self.result_canvas.create_image(cw // 2, ch // 2, image=photo)
+            resized = (cw, ch) != self._result_size
+            if resized:
+                self._result_size = (cw, ch)
+                self.result_canvas.coords(self._result_item, cw // 2, ch // 2)
+            # Only rebuild the panel for a new frame or a new canvas size
+            if resized or jetson_seq != self._jetson_shown_seq:
+                self._jetson_shown_seq = jetson_seq
+                photo, _, _, self._result_buf = rgb_to_photoimage(
+                    jetson_frame, cw, ch, self._result_buf)
+                self._result_photo = photo
+                self.result_canvas.itemconfigure(self._result_item, image=photo)
 
         # Append new VLM messages to text widget
         with self._vlm_lock:
@@ -1339,10 +1720,10 @@ class ReceiverJetsonFullApp:
                 f"Waiting for camera on port {self.args.port} ...")
             self.status_label.configure(style="Warn.TLabel")
         elif camera_frame is not None:
-            fh, fw = camera_frame.shape[:2]
+            fw, fh = camera_size
             cam_str = f"Cam: {fw}x{fh} {self._camera_fps:.0f}fps"
             if self._jetson_connected and jetson_frame is not None:
-                jh, jw = jetson_frame.shape[:2]
+                jw, jh = jetson_size
                 jet_str = f"Jetson: {jw}x{jh} {self._jetson_fps:.0f}fps"
                 self.status_var.set(f"{cam_str} | {jet_str}")
                 self.status_label.configure(style="Status.TLabel")
@@ -1376,6 +1757,19 @@ class ReceiverJetsonFullApp:
 
         self.root.after(50, self._update_display)
 
+    def _update_fps(self):
+        """Once a second: frame-count deltas since the last tick -> FPS."""
+        if not self.running:
+            return
+        now = time.monotonic()
+        elapsed = now - self._fps_time
+        counts = (self._camera_frame_count, self._jetson_frame_count)
+        self._camera_fps = (counts[0] - self._fps_counts[0]) / elapsed
+        self._jetson_fps = (counts[1] - self._fps_counts[1]) / elapsed
+        self._fps_counts = counts
+        self._fps_time = now
+        self.root.after(1000, self._update_fps)
+
     # -- Actions --
 
     def _toggle_mute(self):
@@ -1440,27 +1834,30 @@ class ReceiverJetsonFullApp:
 
     def save_raw(self):
         with self._camera_lock:
-            frame = self._camera_frame
-        if frame is None:
+            jpeg_data = self._camera_jpeg
+        if jpeg_data is None:
             self.status_var.set("No camera frame to save")
             self.status_label.configure(style="Warn.TLabel")
             return
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         fname = f"raw_{ts}.jpg"
-        cv2.imwrite(fname, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        # The received JPEG is written as-is: full resolution, no re-encode
+        with open(fname, "wb") as f:
+            f.write(jpeg_data)
         self.status_var.set(f"Saved raw: {fname}")
         self.status_label.configure(style="Status.TLabel")
 
     def save_processed(self):
         with self._jetson_lock:
-            frame = self._jetson_frame
-        if frame is None:
+            jpeg_data = self._jetson_jpeg
+        if jpeg_data is None:
             self.status_var.set("No processed frame to save")
             self.status_label.configure(style="Warn.TLabel")
             return
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         fname = f"processed_{ts}.jpg"
-        cv2.imwrite(fname, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        with open(fname, "wb") as f:
+            f.write(jpeg_data)
         self.status_var.set(f"Saved processed: {fname}")
         self.status_label.configure(style="Status.TLabel")
 
@@ -1506,6 +1903,12 @@ def main():
     ap.add_argument("--http-port", type=int, default=HTTP_PORT,
                     help=f"HTTP port for /api/chat endpoint (default {HTTP_PORT})")
 
+    ap.add_argument("--tts-format", default=TTS_OUTPUT_FORMAT,
+                    choices=TTS_FORMATS,
+                    help=f"ElevenLabs TTS output format (default "
+                         f"{TTS_OUTPUT_FORMAT}, Pro tier and up; falls back "
+                         f"to {TTS_FALLBACK_FORMAT} via ffmpeg if refused)")
+
     args = ap.parse_args()
 
     root = tk.Tk()